@@ -1224,7 +1224,7 @@ class MainWindow(QMainWindow):
 
         # Update related displays
         self.updateStatusMessage()
-        self.on_data_update([UpdateTopic.on_frame])
+        self.commands.signal_update_later([UpdateTopic.on_frame])
 
         # Trigger event after the overlays have been added
         player.view.updatedViewer.emit()
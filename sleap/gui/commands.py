@@ -26,6 +26,7 @@ and "do" for all commands (this is important if we're going to implement undo)--
 for now it's at least easy to see where this separation is violated.
 """
 
+import heapq
 import logging
 import operator
 import os
@@ -35,8 +36,24 @@ import subprocess
 from enum import Enum
 from glob import glob
 from pathlib import PurePath, Path
+from threading import Event
 import traceback
-from typing import Callable, Dict, Iterator, List, Optional, Type, Tuple
+import weakref
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import (
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    MutableMapping,
+    Optional,
+    Type,
+    Tuple,
+)
 
 import numpy as np
 import cv2
@@ -52,14 +69,8 @@ from sleap.io.convert import default_analysis_filename
 from sleap.io.dataset import Labels
 from sleap.io.format.adaptor import Adaptor
 from sleap.io.format.ndx_pose import NDXPoseAdaptor
-from sleap.gui.dialogs.delete import DeleteDialog
-from sleap.gui.dialogs.importvideos import ImportVideos
+from sleap.info import align
 from sleap.gui.dialogs.filedialog import FileDialog
-from sleap.gui.dialogs.missingfiles import MissingFilesDialog
-from sleap.gui.dialogs.merge import MergeDialog, ReplaceSkeletonTableDialog
-from sleap.gui.dialogs.message import MessageDialog
-from sleap.gui.dialogs.query import QueryDialog
-from sleap.gui.suggestions import VideoFrameSuggestions
 from sleap.gui.state import GuiState
 
 
@@ -100,12 +111,26 @@ class AppCommand:
         topics: List of `UpdateTopic` items. Override this to indicate what
             should be updated after command is executed.
         does_edits: Whether command will modify data that could be saved.
+        undo_strategy: How changes made by the command can be undone:
+            "patch" uses the patches returned by `inverse`, "snapshot" stores
+            a `LabelsSnapshot` from before the command (better suited for
+            commands which change lots of data), "none" means the command
+            can't be undone.
+        has_ask_and_do: Whether the command implements `ask_and_do`. This is
+            set automatically when the command class is defined.
     """
 
     topics: List[UpdateTopic] = []
     does_edits: bool = False
+    undo_strategy: str = "none"
+    has_ask_and_do: bool = False
 
-    def execute(self, context: "CommandContext", params: dict = None):
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.has_ask_and_do = callable(getattr(cls, "ask_and_do", None))
+
+    @classmethod
+    def execute(cls, context: "CommandContext", params: dict = None):
         """Entry point for running command.
 
         This calls internal methods to gather information required for
@@ -131,12 +156,12 @@ class AppCommand:
         """
         params = params or dict()
 
-        if hasattr(self, "ask_and_do") and callable(self.ask_and_do):
-            self.ask_and_do(context, params)
+        if cls.has_ask_and_do:
+            cls.ask_and_do(context, params)
         else:
-            okay = self.ask(context, params)
+            okay = cls.ask(context, params)
             if okay:
-                self.do_with_signal(context, params)
+                cls.do_with_signal(context, params)
 
     @staticmethod
     def ask(context: "CommandContext", params: dict) -> bool:
@@ -154,17 +179,122 @@ class AppCommand:
         """Method for performing action."""
         pass
 
+    @staticmethod
+    def inverse(context: "CommandContext", params: dict) -> Optional[List[dict]]:
+        """Method for describing how to revert the action.
+
+        This is called with the same `params` as `do_action`, but *before* the
+        action is performed, so it can record the state which will change.
+
+        Returns:
+            List of patches which `CommandContext.undo` applies (in order) to
+            revert the action, or None if the action cannot be undone.
+            Each patch is a dictionary with "op" and "path" keys (and "value"
+            or "index" as needed), see `CommandContext.apply_patch`.
+        """
+        return None
+
     @classmethod
     def do_with_signal(cls, context: "CommandContext", params: dict):
         """Wrapper to perform action and notify/track changes.
 
         Don't override this method!
         """
+        with context.transaction():
+            cls._do_with_signal(context, params)
+
+    @classmethod
+    def _do_with_signal(cls, context: "CommandContext", params: dict):
+        patches, snapshot = None, None
+        if cls.does_edits and cls.undo_strategy == "patch":
+            patches = cls.inverse(context, params)
+        elif cls.does_edits and cls.undo_strategy == "snapshot":
+            # Commands which modify data in `ask_and_do` take the snapshot there
+            snapshot = params.get("undo_snapshot", None)
+            if snapshot is None:
+                snapshot = LabelsSnapshot.from_labels(context.labels)
+
+        if cls.does_edits:
+            # Push the change before doing the action so that any changes pushed
+            # by nested commands come after it and are undone first
+            context.changestack_push(
+                cls.__name__, patches=patches, snapshot=snapshot, topics=cls.topics
+            )
         cls.do_action(context, params)
         if cls.topics:
             context.signal_update(cls.topics)
-        if cls.does_edits:
-            context.changestack_push(cls.__name__)
+
+
+@attr.s(auto_attribs=True, slots=True)
+class LabelsSnapshot:
+    """Record of the containers in a `Labels` object, used for undo.
+
+    This stores (shallow) copies of the lists of frames, videos, etc. and the
+    list of instances in each frame, so it's cheap to make and restoring it
+    brings back any frames or instances which were added or removed. Changes
+    made *to* the instances (e.g., moving points) aren't recorded.
+    """
+
+    labeled_frames: List[LabeledFrame]
+    frame_instances: List[List[Instance]]
+    videos: List[Video]
+    skeletons: List[Skeleton]
+    nodes: List[Node]
+    tracks: List[Track]
+    suggestions: list
+    negative_anchors: dict
+
+    @classmethod
+    def from_labels(cls, labels: Labels) -> "LabelsSnapshot":
+        return cls(
+            labeled_frames=list(labels.labeled_frames),
+            frame_instances=[list(lf.instances) for lf in labels.labeled_frames],
+            videos=list(labels.videos),
+            skeletons=list(labels.skeletons),
+            nodes=list(labels.nodes),
+            tracks=list(labels.tracks),
+            suggestions=list(labels.suggestions),
+            negative_anchors=dict(labels.negative_anchors),
+        )
+
+    def restore(self, labels: Labels):
+        """Restores containers in `labels` to match the snapshot."""
+        # Modify lists in place since other objects may hold references to them
+        labels.labeled_frames[:] = self.labeled_frames
+        for lf, instances in zip(self.labeled_frames, self.frame_instances):
+            lf.instances = list(instances)
+        labels.videos[:] = self.videos
+        labels.skeletons[:] = self.skeletons
+        labels.nodes[:] = self.nodes
+        labels.tracks[:] = self.tracks
+        labels.suggestions[:] = self.suggestions
+        labels.negative_anchors.clear()
+        labels.negative_anchors.update(self.negative_anchors)
+        labels.update_cache()
+
+
+@attr.s(auto_attribs=True, slots=True)
+class ChangeStackEntry:
+    """Item on the stack of changes made by user.
+
+    Attributes:
+        change: Description of the change (usually the command name).
+        patches: List of patches which revert the change, or None.
+        snapshot: `LabelsSnapshot` from before the change, or None.
+        topics: The `UpdateTopic` items affected by the change.
+        txn_id: Id of the transaction in which the change was made. Changes
+            in the same transaction are undone together.
+    """
+
+    change: str
+    patches: Optional[List[dict]] = None
+    snapshot: Optional[LabelsSnapshot] = None
+    topics: List[UpdateTopic] = attr.Factory(list)
+    txn_id: Optional[int] = None
+
+    @property
+    def can_undo(self) -> bool:
+        return self.patches is not None or self.snapshot is not None
 
 
 @attr.s(auto_attribs=True)
@@ -189,13 +319,37 @@ class CommandContext:
         app: The `MainWindow`, available for commands that modify the app.
         update_callback: A callback to receive update notifications.
             This function should accept a list of `UpdateTopic` items.
+        max_history: Maximum number of changes to keep on the change stack.
+        max_snapshots: Maximum number of changes on the change stack which
+            keep a `LabelsSnapshot` (older ones can no longer be undone).
+        last_dir: Directory of the file most recently opened using a file
+            dialog, used as the starting directory for the next file dialog.
     """
 
     state: GuiState
     app: "MainWindow"
 
     update_callback: Optional[Callable] = None
-    _change_stack: List = attr.ib(default=attr.Factory(list))
+    max_history: int = 100
+    max_snapshots: int = 10
+    last_dir: Optional[str] = None
+    _change_stack: Deque[ChangeStackEntry] = attr.ib(init=False)
+    _stack_base_is_saved: bool = True
+    _pending_topics: set = attr.ib(factory=set)
+    _batch_depth: int = 0
+    _deferred_topics: set = attr.ib(factory=set)
+    _deferred_flush_scheduled: bool = False
+    _suggestion_index: Dict[int, int] = attr.ib(factory=dict)
+    _txn_id: Optional[int] = None
+    _last_txn_id: int = 0
+    _suggestions_worker: Optional["SuggestionsWorker"] = None
+    _export_clip_thread: Optional["ExportClipThread"] = None
+    _rng: np.random.Generator = attr.ib(factory=np.random.default_rng)
+
+    @_change_stack.default
+    def _make_change_stack(self) -> Deque[ChangeStackEntry]:
+        # Oldest changes are dropped once we reach the maximum
+        return deque(maxlen=self.max_history)
 
     @classmethod
     def from_labels(cls, labels: Labels) -> "CommandContext":
@@ -210,36 +364,278 @@ class CommandContext:
         return self.app.labels
 
     def signal_update(self, what: List[UpdateTopic]):
-        """Calls the update callback after data has been changed."""
+        """Calls the update callback after data has been changed.
+
+        Inside a `batch` the topics are collected and the callback is called
+        once when the outermost batch exits.
+        """
+        if UpdateTopic.suggestions in what or UpdateTopic.all in what:
+            self._suggestion_index.clear()
+        self._pending_topics.update(what)
+        if self._batch_depth == 0:
+            self._flush_updates()
+
+    def suggestion_index_of(self, suggestion: "SuggestionFrame") -> int:
+        """Returns the position of a suggestion in the project suggestions.
+
+        Positions are cached and the cache is cleared whenever the
+        suggestions topic is signaled.
+        """
+        suggestions = self.labels.get_suggestions()
+        idx = self._suggestion_index.get(id(suggestion))
+        if idx is None or idx >= len(suggestions) or suggestions[idx] is not suggestion:
+            self._suggestion_index = {id(item): i for i, item in enumerate(suggestions)}
+            idx = self._suggestion_index.get(id(suggestion))
+            if idx is None:
+                # Fall back to comparing by value (raises if not found)
+                idx = suggestions.index(suggestion)
+        return idx
+
+    def signal_update_later(self, what: List[UpdateTopic]):
+        """Calls the update callback on the next tick of the Qt event loop.
+
+        Topics signaled repeatedly before the event loop gets a chance to run
+        (e.g., while holding down a key to move through frames) are coalesced
+        into a single call, so the callback only handles the latest state.
+        """
+        self._deferred_topics.update(what)
+        if not self._deferred_flush_scheduled:
+            self._deferred_flush_scheduled = True
+            QtCore.QTimer.singleShot(0, self._flush_deferred_updates)
+
+    def _flush_deferred_updates(self):
+        self._deferred_flush_scheduled = False
+        what = list(self._deferred_topics)
+        self._deferred_topics.clear()
+        if what:
+            self.signal_update(what)
+
+    @contextmanager
+    def batch(self):
+        """Context manager which coalesces update notifications.
+
+        All topics signaled within the block (including within nested
+        batches) are passed to the update callback in a single call.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._flush_updates()
+
+    @contextmanager
+    def transaction(self):
+        """Context manager which groups changes into a single undo step.
+
+        Changes pushed onto the change stack within the block (including within
+        nested transactions) are tagged with the same transaction id.
+        """
+        if self._txn_id is not None:
+            yield self._txn_id
+            return
+
+        self._txn_id = self._new_txn_id()
+        try:
+            yield self._txn_id
+        finally:
+            self._txn_id = None
+
+    def _new_txn_id(self) -> int:
+        self._last_txn_id += 1
+        return self._last_txn_id
+
+    def _flush_updates(self):
+        """Passes any pending topics to the update callback."""
+        if not self._pending_topics:
+            return
+        if UpdateTopic.all in self._pending_topics:
+            what = [UpdateTopic.all]
+        else:
+            what = list(self._pending_topics)
+        self._pending_topics.clear()
         if callable(self.update_callback):
             self.update_callback(what)
 
-    def changestack_push(self, change: str = ""):
-        """Adds to stack of changes made by user."""
-        # Currently the change doesn't store any data, and we're only using this
-        # to determine if there are unsaved changes. Eventually we could use this
-        # to support undo/redo.
-        self._change_stack.append(change)
-        # print(len(self._change_stack))
+    def changestack_push(
+        self,
+        change: str = "",
+        patches: Optional[List[dict]] = None,
+        snapshot: Optional[LabelsSnapshot] = None,
+        topics: Optional[List[UpdateTopic]] = None,
+    ):
+        """Adds to stack of changes made by user.
+
+        Args:
+            change: Description of the change.
+            patches: List of patches which revert the change (if it can be
+                undone), see `AppCommand.inverse`.
+            snapshot: `LabelsSnapshot` from before the change (if it can be
+                undone by restoring the snapshot).
+            topics: The `UpdateTopic` items to signal after undoing the change.
+        """
+        txn_id = self._txn_id if self._txn_id is not None else self._new_txn_id()
+        if len(self._change_stack) == self._change_stack.maxlen:
+            # The oldest entry is about to be dropped, so the bottom of the stack
+            # is now the state after that change
+            self._stack_base_is_saved = self._change_stack[0].change == "SAVE"
+        self._change_stack.append(
+            ChangeStackEntry(
+                change=change,
+                patches=patches,
+                snapshot=snapshot,
+                topics=topics or [],
+                txn_id=txn_id,
+            )
+        )
+        if snapshot is not None:
+            self._limit_snapshots()
         self.state["has_changes"] = True
 
+    def _limit_snapshots(self):
+        """Drops the oldest snapshots if there are more than `max_snapshots`."""
+        with_snapshots = [
+            entry for entry in self._change_stack if entry.snapshot is not None
+        ]
+        for entry in with_snapshots[: -self.max_snapshots or None]:
+            entry.snapshot = None
+
     def changestack_savepoint(self):
         """Marks that project was just saved."""
         self.changestack_push("SAVE")
         self.state["has_changes"] = False
 
-    def changestack_clear(self):
-        """Clears stack of changes."""
-        self._change_stack = list()
-        self.state["has_changes"] = False
+    def changestack_clear(self, has_changes: bool = False):
+        """Clears stack of changes.
+
+        Args:
+            has_changes: Whether the project has unsaved changes which aren't on
+                the stack (e.g., if it was modified when it was loaded).
+        """
+        self._change_stack.clear()
+        self._stack_base_is_saved = not has_changes
+        self.state["has_changes"] = has_changes
 
     @property
     def has_any_changes(self):
-        return len(self._change_stack) > 0
+        return len(self._change_stack) > 0 or not self._stack_base_is_saved
+
+    def undo(self) -> bool:
+        """Reverts the most recent change made by user (if possible).
+
+        All changes made in the same transaction are reverted together (most
+        recent first), and only if every one of them can be undone.
+
+        Returns:
+            True if a change was reverted, False if there's nothing to undo or
+            the most recent change cannot be undone.
+        """
+        stack = self._change_stack
+
+        # Saving doesn't modify the project, so look past any save points.
+        save_points = []
+        while stack and stack[-1].change == "SAVE":
+            save_points.append(stack.pop())
+
+        # Most recent changes first
+        entries = []
+        if stack:
+            txn_id = stack[-1].txn_id
+            while stack and stack[-1].txn_id == txn_id:
+                entries.append(stack.pop())
+
+        if not entries or not all(entry.can_undo for entry in entries):
+            stack.extend(reversed(entries))
+            stack.extend(reversed(save_points))
+            return False
+        reverted_saved_change = len(save_points) > 0
+
+        with self.batch():
+            for entry in entries:
+                if entry.snapshot is not None:
+                    self._restore_snapshot(entry.snapshot)
+                for patch in entry.patches or []:
+                    self.apply_patch(patch)
+                self.signal_update(entry.topics + [UpdateTopic.frame])
+
+        if stack:
+            at_savepoint = stack[-1].change == "SAVE"
+        else:
+            at_savepoint = self._stack_base_is_saved
+        self.state["has_changes"] = reverted_saved_change or not at_savepoint
+        return True
+
+    def _restore_snapshot(self, snapshot: LabelsSnapshot):
+        """Restores labels from snapshot and updates state to match."""
+        snapshot.restore(self.labels)
+
+        if self.state["video"] not in self.labels.videos:
+            self.state["video"] = self.labels.videos[-1] if self.labels.videos else None
+        if self.state["skeleton"] not in self.labels.skeletons:
+            self.state["skeleton"] = (
+                self.labels.skeletons[-1] if self.labels.skeletons else None
+            )
+        self.state["instance"] = None
+        self.signal_update([UpdateTopic.all])
+
+    def apply_patch(self, patch: dict):
+        """Applies a single patch (as returned by `AppCommand.inverse`).
+
+        Supported patches are:
+
+        * "replace" with path ("instance", instance, "points", node) and
+          (x, y) value: moves the point for node.
+        * "add" with path ("frame", labeled_frame, "instances"), an `Instance`
+          value and index: inserts the instance back into the frame.
+        * "remove" with path ("frame", labeled_frame, "instances") and index:
+          removes the instance at that index from the frame (if any).
+        * "remove" with path ("labels", "frames") and a `LabeledFrame` value:
+          removes the frame from the labels (if present).
+        * "remove" with path ("skeleton", skeleton, "edges") and a
+          (source, destination) value: deletes the edge from the skeleton.
+
+        Raises:
+            ValueError: If the patch isn't supported.
+        """
+        op, path = patch["op"], patch["path"]
+
+        if op == "replace" and path[0] == "instance" and path[2] == "points":
+            instance, node = path[1], path[3]
+            point = instance[node]
+            point.x, point.y = patch["value"]
+
+        elif op == "add" and path[0] == "frame":
+            lf, instance = path[1], patch["value"]
+            self.labels.add_instance(lf, instance)
+            # Put the instance back where it was in the list of instances
+            lf.instances.insert(patch["index"], lf.instances.pop())
+
+        elif op == "remove" and path[0] == "frame":
+            lf, index = path[1], patch["index"]
+            if index < len(lf.instances):
+                instance = lf.instances[index]
+                self.labels.remove_instance(lf, instance)
+                if self.state["instance"] is instance:
+                    self.state["instance"] = None
+
+        elif op == "remove" and path == ("labels", "frames"):
+            lf = patch["value"]
+            if lf in self.labels.labels:
+                self.labels.remove_frame(lf)
+
+        elif op == "remove" and path[0] == "skeleton" and path[2] == "edges":
+            skeleton, (src_node, dst_node) = path[1], patch["value"]
+            if skeleton.has_edge(src_node, dst_node):
+                skeleton.delete_edge(src_node, dst_node)
+
+        else:
+            raise ValueError(f"Unsupported patch: {op} {path}")
 
     def execute(self, command: Type[AppCommand], **kwargs):
         """Execute command in this context, passing named arguments."""
-        command().execute(context=self, params=kwargs)
+        with self.batch(), self.transaction():
+            command.execute(context=self, params=kwargs)
 
     # File commands
 
@@ -651,7 +1047,7 @@ class LoadLabelsObject(AppCommand):
         context.state["labels"] = labels
         context.state["filename"] = filename
 
-        context.changestack_clear()
+        context.changestack_clear(has_changes=params.get("changed_on_load", False))
         context.app.color_manager.labels = context.labels
         context.app.color_manager.set_palette(context.state["palette"])
 
@@ -665,7 +1061,6 @@ class LoadLabelsObject(AppCommand):
             context.state["video"] = labels.videos[0]
 
         context.state["project_loaded"] = True
-        context.state["has_changes"] = params.get("changed_on_load", False)
 
         # This is not listed as an edit command since we want a clean changestack
         context.app.on_data_update([UpdateTopic.project, UpdateTopic.all])
@@ -703,6 +1098,13 @@ class LoadProjectFile(LoadLabelsObject):
 
 
 class OpenProject(AppCommand):
+    file_filter = ";;".join(
+        [
+            "SLEAP HDF5 dataset (*.slp *.h5 *.hdf5)",
+            "JSON labels (*.json *.json.zip)",
+        ]
+    )
+
     @staticmethod
     def do_action(context: "CommandContext", params: dict):
         filename = params["filename"]
@@ -725,26 +1127,24 @@ class OpenProject(AppCommand):
     @staticmethod
     def ask(context: "CommandContext", params: dict) -> bool:
         if params["filename"] is None:
-            filters = [
-                "SLEAP HDF5 dataset (*.slp *.h5 *.hdf5)",
-                "JSON labels (*.json *.json.zip)",
-            ]
-
             filename, selected_filter = FileDialog.open(
                 context.app,
-                dir=None,
+                dir=context.last_dir,
                 caption="Import labeled data...",
-                filter=";;".join(filters),
+                filter=OpenProject.file_filter,
             )
 
             if len(filename) == 0:
                 return False
 
+            context.last_dir = os.path.dirname(filename)
             params["filename"] = filename
         return True
 
 
 class ImportAlphaTracker(AppCommand):
+    file_filter = "JSON (*.json)"
+
     @staticmethod
     def do_action(context: "CommandContext", params: dict):
 
@@ -761,18 +1161,18 @@ class ImportAlphaTracker(AppCommand):
 
     @staticmethod
     def ask(context: "CommandContext", params: dict) -> bool:
-        filters = ["JSON (*.json)"]
-
         filename, selected_filter = FileDialog.open(
             context.app,
-            dir=None,
+            dir=context.last_dir,
             caption="Import AlphaTracker dataset...",
-            filter=";;".join(filters),
+            filter=ImportAlphaTracker.file_filter,
         )
 
         if len(filename) == 0:
             return False
 
+        context.last_dir = os.path.dirname(filename)
+
         file_dir = os.path.dirname(filename)
         video_path = os.path.join(file_dir, "video.mp4")
 
@@ -802,7 +1202,7 @@ class ImportNWB(AppCommand):
 
         filename, selected_filter = FileDialog.open(
             context.app,
-            dir=None,
+            dir=context.last_dir,
             caption="Import NWB dataset...",
             filter=";;".join(filters),
         )
@@ -810,6 +1210,8 @@ class ImportNWB(AppCommand):
         if len(filename) == 0:
             return False
 
+        context.last_dir = os.path.dirname(filename)
+
         file_dir = os.path.dirname(filename)
 
         params["filename"] = filename
@@ -818,6 +1220,8 @@ class ImportNWB(AppCommand):
 
 
 class ImportDeepPoseKit(AppCommand):
+    file_filter = "HDF5 (*.h5 *.hdf5)"
+
     @staticmethod
     def do_action(context: "CommandContext", params: dict):
 
@@ -833,18 +1237,20 @@ class ImportDeepPoseKit(AppCommand):
 
     @staticmethod
     def ask(context: "CommandContext", params: dict) -> bool:
-        filters = ["HDF5 (*.h5 *.hdf5)"]
+        from sleap.gui.dialogs.missingfiles import MissingFilesDialog
 
         filename, selected_filter = FileDialog.open(
             context.app,
-            dir=None,
+            dir=context.last_dir,
             caption="Import DeepPoseKit dataset...",
-            filter=";;".join(filters),
+            filter=ImportDeepPoseKit.file_filter,
         )
 
         if len(filename) == 0:
             return False
 
+        context.last_dir = os.path.dirname(filename)
+
         file_dir = os.path.dirname(filename)
         paths = [
             os.path.join(file_dir, "video.mp4"),
@@ -867,6 +1273,8 @@ class ImportDeepPoseKit(AppCommand):
 
 
 class ImportLEAP(AppCommand):
+    file_filter = "Matlab (*.mat)"
+
     @staticmethod
     def do_action(context: "CommandContext", params: dict):
 
@@ -880,24 +1288,26 @@ class ImportLEAP(AppCommand):
 
     @staticmethod
     def ask(context: "CommandContext", params: dict) -> bool:
-        filters = ["Matlab (*.mat)"]
-
         filename, selected_filter = FileDialog.open(
             context.app,
-            dir=None,
+            dir=context.last_dir,
             caption="Import LEAP Matlab dataset...",
-            filter=";;".join(filters),
+            filter=ImportLEAP.file_filter,
         )
 
         if len(filename) == 0:
             return False
 
+        context.last_dir = os.path.dirname(filename)
+
         params["filename"] = filename
 
         return True
 
 
 class ImportCoco(AppCommand):
+    file_filter = "JSON (*.json)"
+
     @staticmethod
     def do_action(context: "CommandContext", params: dict):
 
@@ -911,18 +1321,18 @@ class ImportCoco(AppCommand):
 
     @staticmethod
     def ask(context: "CommandContext", params: dict) -> bool:
-        filters = ["JSON (*.json)"]
-
         filename, selected_filter = FileDialog.open(
             context.app,
-            dir=None,
+            dir=context.last_dir,
             caption="Import COCO dataset...",
-            filter=";;".join(filters),
+            filter=ImportCoco.file_filter,
         )
 
         if len(filename) == 0:
             return False
 
+        context.last_dir = os.path.dirname(filename)
+
         params["filename"] = filename
         params["img_dir"] = os.path.dirname(filename)
 
@@ -930,6 +1340,8 @@ class ImportCoco(AppCommand):
 
 
 class ImportDeepLabCut(AppCommand):
+    file_filter = "DeepLabCut dataset (*.yaml *.csv)"
+
     @staticmethod
     def do_action(context: "CommandContext", params: dict):
 
@@ -941,18 +1353,18 @@ class ImportDeepLabCut(AppCommand):
 
     @staticmethod
     def ask(context: "CommandContext", params: dict) -> bool:
-        filters = ["DeepLabCut dataset (*.yaml *.csv)"]
-
         filename, selected_filter = FileDialog.open(
             context.app,
-            dir=None,
+            dir=context.last_dir,
             caption="Import DeepLabCut dataset...",
-            filter=";;".join(filters),
+            filter=ImportDeepLabCut.file_filter,
         )
 
         if len(filename) == 0:
             return False
 
+        context.last_dir = os.path.dirname(filename)
+
         params["filename"] = filename
 
         return True
@@ -961,6 +1373,8 @@ class ImportDeepLabCut(AppCommand):
 class ImportDeepLabCutFolder(AppCommand):
     @staticmethod
     def do_action(context: "CommandContext", params: dict):
+        from sleap.gui.dialogs.message import MessageDialog
+
         csv_files = ImportDeepLabCutFolder.find_dlc_files_in_folder(
             params["folder_name"]
         )
@@ -981,12 +1395,14 @@ class ImportDeepLabCutFolder(AppCommand):
     def ask(context: "CommandContext", params: dict) -> bool:
         folder_name = FileDialog.openDir(
             context.app,
-            dir=None,
+            dir=context.last_dir,
             caption="Select a folder with DeepLabCut datasets...",
         )
 
         if len(folder_name) == 0:
             return False
+
+        context.last_dir = folder_name
         params["folder_name"] = folder_name
         return True
 
@@ -1007,6 +1423,8 @@ class ImportDeepLabCutFolder(AppCommand):
 
 
 class ImportAnalysisFile(AppCommand):
+    file_filter = "SLEAP Analysis HDF5 (*.h5 *.hdf5)"
+
     @staticmethod
     def do_action(context: "CommandContext", params: dict):
         from sleap.io.format import read
@@ -1024,16 +1442,20 @@ class ImportAnalysisFile(AppCommand):
 
     @staticmethod
     def ask(context: "CommandContext", params: dict) -> bool:
+        from sleap.gui.dialogs.importvideos import ImportVideos
+
         filename, selected_filter = FileDialog.open(
             context.app,
-            dir=None,
+            dir=context.last_dir,
             caption="Import SLEAP Analysis HDF5...",
-            filter="SLEAP Analysis HDF5 (*.h5 *.hdf5)",
+            filter=ImportAnalysisFile.file_filter,
         )
 
         if len(filename) == 0:
             return False
 
+        context.last_dir = os.path.dirname(filename)
+
         QtWidgets.QMessageBox(text="Please locate the video for this dataset.").exec_()
 
         video_param_list = ImportVideos().ask()
@@ -1259,15 +1681,30 @@ def open_file(filename: str):
         subprocess.call([opener, filename])
 
 
-class ExportLabeledClip(AppCommand):
-    @staticmethod
-    def do_action(context: CommandContext, params: dict):
+class ExportClipThread(QtCore.QThread):
+    """Thread for writing video with annotations (see `save_labeled_video`).
+
+    The `progress` signal is emitted with the number of frames written.
+    Set `cancel_event` to stop writing the video.
+    """
+
+    progress = QtCore.Signal(int)
+
+    def __init__(self, labels: Labels, video: Video, params: dict, parent=None):
+        super(ExportClipThread, self).__init__(parent)
+        self.labels = labels
+        self.video = video
+        self.params = params
+        self.cancel_event = Event()
+
+    def run(self):
         from sleap.io.visuals import save_labeled_video
 
+        params = self.params
         save_labeled_video(
             filename=params["filename"],
-            labels=context.state["labels"],
-            video=context.state["video"],
+            labels=self.labels,
+            video=self.video,
             frames=list(params["frames"]),
             fps=params["fps"],
             color_manager=params["color_manager"],
@@ -1276,12 +1713,56 @@ class ExportLabeledClip(AppCommand):
             marker_size=params["marker size"],
             scale=params["scale"],
             crop_size_xy=params["crop"],
-            gui_progress=True,
+            progress_callback=lambda frames_complete, _: self.progress.emit(
+                frames_complete
+            ),
+            cancel_event=self.cancel_event,
         )
 
-        if params["open_when_done"]:
-            # Open the file using default video playing app
-            open_file(params["filename"])
+
+class ExportLabeledClip(AppCommand):
+    @staticmethod
+    def do_action(context: CommandContext, params: dict):
+        if context._export_clip_thread is not None:
+            # Only export one clip at a time
+            return
+
+        frames = list(params["frames"])
+        params["frames"] = frames
+
+        # Write the video in another thread so the GUI stays responsive
+        thread = ExportClipThread(
+            labels=context.state["labels"],
+            video=context.state["video"],
+            params=params,
+        )
+
+        # The thread reads the labels while writing the video, so the dialog
+        # is window-modal to keep them from being edited until it's done
+        progress_win = QProgressDialog(
+            f"Generating video with {len(frames)} frames...",
+            "Cancel",
+            0,
+            len(frames),
+            context.app,
+        )
+        progress_win.setWindowModality(QtCore.Qt.WindowModal)
+        progress_win.setMinimumWidth(300)
+        progress_win.canceled.connect(thread.cancel_event.set)
+        thread.progress.connect(progress_win.setValue)
+
+        def on_finished():
+            context._export_clip_thread = None
+            canceled = thread.cancel_event.is_set()
+            progress_win.close()
+            if params["open_when_done"] and not canceled:
+                # Open the file using default video playing app
+                open_file(params["filename"])
+
+        thread.finished.connect(on_finished, QtCore.Qt.QueuedConnection)
+        context._export_clip_thread = thread
+        progress_win.show()
+        thread.start()
 
     @staticmethod
     def ask(context: CommandContext, params: dict) -> bool:
@@ -1414,6 +1895,12 @@ def export_dataset_gui(
 class ExportDatasetWithImages(AppCommand):
     all_labeled = False
     suggested = False
+    file_filter = ";;".join(
+        [
+            "SLEAP HDF5 dataset (*.slp *.h5)",
+            "Compressed JSON dataset (*.json *.json.zip)",
+        ]
+    )
 
     @classmethod
     def do_action(cls, context: CommandContext, params: dict):
@@ -1426,11 +1913,6 @@ class ExportDatasetWithImages(AppCommand):
 
     @staticmethod
     def ask(context: CommandContext, params: dict) -> bool:
-        filters = [
-            "SLEAP HDF5 dataset (*.slp *.h5)",
-            "Compressed JSON dataset (*.json *.json.zip)",
-        ]
-
         dirname = os.path.dirname(context.state["filename"])
         basename = os.path.basename(context.state["filename"])
 
@@ -1441,7 +1923,7 @@ class ExportDatasetWithImages(AppCommand):
             context.app,
             caption="Save Labeled Frames As...",
             dir=new_filename,
-            filter=";;".join(filters),
+            filter=ExportDatasetWithImages.file_filter,
         )
         if len(filename) == 0:
             return False
@@ -1485,7 +1967,8 @@ class GoIteratorCommand(AppCommand):
         except StopIteration:
             return False
 
-        context.state["frame_idx"] = next_lf.frame_idx
+        if context.state["frame_idx"] != next_lf.frame_idx:
+            context.state["frame_idx"] = next_lf.frame_idx
         return True
 
     @staticmethod
@@ -1519,20 +2002,20 @@ class GoNextLabeledFrame(GoIteratorCommand):
 class GoNextUserLabeledFrame(GoIteratorCommand):
     @staticmethod
     def _get_frame_iterator(context: CommandContext):
-        frames = context.labels.frames(
-            context.state["video"], from_frame_idx=context.state["frame_idx"]
+        return context.labels.frames(
+            context.state["video"],
+            from_frame_idx=context.state["frame_idx"],
+            user_only=True,
         )
-        # Filter to frames with user instances
-        frames = filter(lambda lf: lf.has_user_instances, frames)
-        return frames
 
 
 class NavCommand(AppCommand):
     @staticmethod
     def go_to(context, frame_idx: int, video: Optional[Video] = None):
-        if video is not None:
+        if video is not None and context.state["video"] is not video:
             context.state["video"] = video
-        context.state["frame_idx"] = frame_idx
+        if context.state["frame_idx"] != frame_idx:
+            context.state["frame_idx"] = frame_idx
 
 
 class GoLastInteractedFrame(NavCommand):
@@ -1559,9 +2042,7 @@ class GoNextSuggestedFrame(NavCommand):
             cls.go_to(
                 context, next_suggestion_frame.frame_idx, next_suggestion_frame.video
             )
-            selection_idx = context.labels.get_suggestions().index(
-                next_suggestion_frame
-            )
+            selection_idx = context.suggestion_index_of(next_suggestion_frame)
             context.state["suggestion_idx"] = selection_idx
 
 
@@ -1576,16 +2057,15 @@ class GoNextTrackFrame(NavCommand):
         cur_idx = context.state["frame_idx"]
         track_ranges = context.labels.get_track_occupancy(video)
 
-        later_tracks = [
-            (track_range.start, track)
-            for track, track_range in track_ranges.items()
-            if track_range.start is not None and track_range.start > cur_idx
-        ]
-
-        later_tracks.sort(key=operator.itemgetter(0))
+        # Find the track which starts soonest after the current frame
+        next_idx, next_track = None, None
+        for track, track_range in track_ranges.items():
+            start = track_range.start
+            if start is not None and start > cur_idx:
+                if next_idx is None or start < next_idx:
+                    next_idx, next_track = start, track
 
-        if later_tracks:
-            next_idx, next_track = later_tracks[0]
+        if next_idx is not None:
             cls.go_to(context, next_idx)
 
             # Select the instance in the new track
@@ -1689,25 +2169,28 @@ class ToggleGrayscale(EditCommand):
 
 class AddVideo(EditCommand):
     topics = [UpdateTopic.video]
+    undo_strategy = "snapshot"
 
     @staticmethod
     def do_action(context: CommandContext, params: dict):
+        from sleap.gui.dialogs.importvideos import ImportVideos
+
         import_list = params["import_list"]
 
         new_videos = ImportVideos.create_videos(import_list)
-        video = None
-        for video in new_videos:
-            # Add to labels
-            context.labels.add_video(video)
-            context.changestack_push("add video")
+
+        # Add to labels
+        context.labels.add_videos(new_videos)
 
         # Load if no video currently loaded
-        if context.state["video"] is None:
-            context.state["video"] = video
+        if context.state["video"] is None and new_videos:
+            context.state["video"] = new_videos[-1]
 
     @staticmethod
     def ask(context: CommandContext, params: dict) -> bool:
         """Shows gui for adding video to project."""
+        from sleap.gui.dialogs.importvideos import ImportVideos
+
         params["import_list"] = ImportVideos().ask()
 
         return len(params["import_list"]) > 0
@@ -1718,18 +2201,18 @@ class ShowImportVideos(EditCommand):
 
     @staticmethod
     def do_action(context: CommandContext, params: dict):
+        from sleap.gui.dialogs.importvideos import ImportVideos
+
         filenames = params["filenames"]
         import_list = ImportVideos().ask(filenames=filenames)
         new_videos = ImportVideos.create_videos(import_list)
-        video = None
-        for video in new_videos:
-            # Add to labels
-            context.labels.add_video(video)
-            context.changestack_push("add video")
+
+        # Add to labels
+        context.labels.add_videos(new_videos)
 
         # Load if no video currently loaded
-        if context.state["video"] is None:
-            context.state["video"] = video
+        if context.state["video"] is None and new_videos:
+            context.state["video"] = new_videos[-1]
 
 
 class ReplaceVideo(EditCommand):
@@ -1740,6 +2223,7 @@ class ReplaceVideo(EditCommand):
 
         import_list = params["import_list"]
 
+        lfs_to_remove = []
         for import_item, video in import_list:
             import_params = import_item["params"]
 
@@ -1753,27 +2237,31 @@ class ReplaceVideo(EditCommand):
                 )
             video.backend.reset(**import_params)
 
-            # Remove frames in video past last frame index
+            # Find frames in video past last frame index
             last_vid_frame = video.last_frame_idx
-            lfs: List[LabeledFrame] = list(context.labels.get(video))
-            if lfs is not None:
-                lfs = [lf for lf in lfs if lf.frame_idx > last_vid_frame]
-                context.labels.remove_frames(lfs)
+            lfs_to_remove.extend(
+                lf for lf in context.labels.find(video) if lf.frame_idx > last_vid_frame
+            )
+
+        # Remove frames for all of the videos at once
+        if lfs_to_remove:
+            context.labels.remove_frames(lfs_to_remove)
 
-            # Update seekbar and video length through callbacks
-            context.state.emit("video")
+        # Update seekbar and video length through callbacks
+        context.state.emit("video")
 
     @staticmethod
     def ask(context: CommandContext, params: dict) -> bool:
         """Shows gui for replacing videos in project."""
+        from sleap.gui.dialogs.importvideos import ImportVideos
+        from sleap.gui.dialogs.missingfiles import MissingFilesDialog
 
         def _get_truncation_message(truncation_messages, path, video):
             reader = cv2.VideoCapture(path)
             last_vid_frame = int(reader.get(cv2.CAP_PROP_FRAME_COUNT))
             lfs: List[LabeledFrame] = list(context.labels.get(video))
-            if lfs is not None:
-                lfs.sort(key=lambda lf: lf.frame_idx)
-                last_lf_frame = lfs[-1].frame_idx
+            if lfs:
+                last_lf_frame = max(lf.frame_idx for lf in lfs)
                 lfs = [lf for lf in lfs if lf.frame_idx > last_vid_frame]
 
                 # Message to warn users that labels will be removed if proceed
@@ -1799,22 +2287,16 @@ class ReplaceVideo(EditCommand):
             return False
 
         # Select the videos we want to swap
-        old_paths = [video.backend.filename for video in context.labels.videos]
+        all_videos = list(context.labels.videos)
+        old_paths = [video.backend.filename for video in all_videos]
         paths = list(old_paths)
         okay = MissingFilesDialog(filenames=paths, replace=True).exec_()
         if not okay:
             return False
 
         # Only return an import list for videos we swap
-        new_paths = [
-            (path, video_idx)
-            for video_idx, (path, old_path) in enumerate(zip(paths, old_paths))
-            if path != old_path
-        ]
-
         new_paths = []
         old_videos = dict()
-        all_videos = context.labels.videos
         truncation_messages = dict()
         for video_idx, (path, old_path) in enumerate(zip(paths, old_paths)):
             if path != old_path:
@@ -1831,13 +2313,14 @@ class ReplaceVideo(EditCommand):
         old_videos_to_replace = [
             old_videos[imp["params"]["filename"]] for imp in import_list
         ]
-        params["import_list"] = zip(import_list, old_videos_to_replace)
+        params["import_list"] = list(zip(import_list, old_videos_to_replace))
 
         return len(import_list) > 0
 
 
 class RemoveVideo(EditCommand):
     topics = [UpdateTopic.video, UpdateTopic.suggestions]
+    undo_strategy = "snapshot"
 
     @staticmethod
     def do_action(context: CommandContext, params: dict):
@@ -1880,14 +2363,14 @@ class RemoveVideo(EditCommand):
 
 class OpenSkeleton(EditCommand):
     topics = [UpdateTopic.skeleton]
+    file_filter = ";;".join(["JSON skeleton (*.json)", "HDF5 skeleton (*.h5 *.hdf5)"])
 
     @staticmethod
     def load_skeleton(filename: str):
         if filename.endswith(".json"):
             new_skeleton = Skeleton.load_json(filename)
         elif filename.endswith((".h5", ".hdf5")):
-            sk_list = Skeleton.load_all_hdf5(filename)
-            new_skeleton = sk_list[0]
+            new_skeleton = Skeleton.load_first_hdf5(filename)
         return new_skeleton
 
     @staticmethod
@@ -1932,7 +2415,8 @@ class OpenSkeleton(EditCommand):
 
     @staticmethod
     def ask(context: CommandContext, params: dict) -> bool:
-        filters = ["JSON skeleton (*.json)", "HDF5 skeleton (*.h5 *.hdf5)"]
+        from sleap.gui.dialogs.merge import ReplaceSkeletonTableDialog
+
         # Check whether to load from file or preset
         if params.get("template", False):
             # Get selected template from dropdown
@@ -1942,10 +2426,12 @@ class OpenSkeleton(EditCommand):
         else:
             filename, selected_filter = FileDialog.open(
                 context.app,
-                dir=None,
+                dir=context.last_dir,
                 caption="Open skeleton...",
-                filter=";;".join(filters),
+                filter=OpenSkeleton.file_filter,
             )
+            if len(filename) > 0:
+                context.last_dir = os.path.dirname(filename)
 
         if len(filename) == 0:
             return False
@@ -2084,15 +2570,16 @@ class OpenSkeleton(EditCommand):
 
 
 class SaveSkeleton(AppCommand):
+    file_filter = ";;".join(["JSON skeleton (*.json)", "HDF5 skeleton (*.h5 *.hdf5)"])
+
     @staticmethod
     def ask(context: CommandContext, params: dict) -> bool:
         default_name = "skeleton.json"
-        filters = ["JSON skeleton (*.json)", "HDF5 skeleton (*.h5 *.hdf5)"]
         filename, selected_filter = FileDialog.save(
             context.app,
             caption="Save As...",
             dir=default_name,
-            filter=";;".join(filters),
+            filter=SaveSkeleton.file_filter,
         )
 
         if len(filename) == 0:
@@ -2116,9 +2603,10 @@ class NewNode(EditCommand):
     @staticmethod
     def do_action(context: CommandContext, params: dict):
         # Find new part name
+        existing_names = set(context.state["skeleton"].node_names)
         part_name = "new_part"
         i = 1
-        while part_name in context.state["skeleton"]:
+        while part_name in existing_names:
             part_name = f"new_part_{i}"
             i += 1
 
@@ -2171,6 +2659,25 @@ class SetNodeSymmetry(EditCommand):
 
 class NewEdge(EditCommand):
     topics = [UpdateTopic.skeleton]
+    undo_strategy = "patch"
+
+    @staticmethod
+    def inverse(context: CommandContext, params: dict) -> List[dict]:
+        skeleton = context.state["skeleton"]
+        src_node, dst_node = params["src_node"], params["dst_node"]
+        if (
+            src_node not in skeleton
+            or dst_node not in skeleton
+            or skeleton.has_edge(src_node, dst_node)
+        ):
+            return []
+        return [
+            {
+                "op": "remove",
+                "path": ("skeleton", skeleton, "edges"),
+                "value": (src_node, dst_node),
+            }
+        ]
 
     @staticmethod
     def do_action(context: CommandContext, params: dict):
@@ -2210,6 +2717,18 @@ class InstanceDeleteCommand(EditCommand):
     def get_frame_instance_list(context: CommandContext, params: dict):
         raise NotImplementedError("Call to virtual method.")
 
+    @staticmethod
+    def _get_predicted_instances(
+        lfs: Iterable[LabeledFrame],
+    ) -> List[Tuple[LabeledFrame, PredictedInstance]]:
+        """Returns (labeled frame, instance) tuples for predictions in frames."""
+        return [
+            (lf, inst)
+            for lf in lfs
+            for inst in lf.instances
+            if type(inst) is PredictedInstance
+        ]
+
     @staticmethod
     def _confirm_deletion(context: CommandContext, lf_inst_list: List) -> bool:
         """Helper function to confirm before deleting instances.
@@ -2241,19 +2760,19 @@ class InstanceDeleteCommand(EditCommand):
     @staticmethod
     def _do_deletion(context: CommandContext, lf_inst_list: List[int]):
         # Delete the instances
-        lfs_to_remove = []
-        for lf, inst in lf_inst_list:
-            context.labels.remove_instance(lf, inst, in_transaction=True)
-            if len(lf.instances) == 0:
-                lfs_to_remove.append(lf)
-
-        context.labels.remove_frames(lfs_to_remove)
+        context.labels.remove_instances(lf_inst_list, in_transaction=True)
 
-        # Update caches since we skipped doing this after each deletion
-        context.labels.update_cache()
+        # Remove frames which no longer have any instances
+        lfs_to_remove = [
+            lf for lf in dict.fromkeys(lf for lf, _ in lf_inst_list) if not lf.instances
+        ]
 
-        # Update visuals
-        context.changestack_push("delete instances")
+        # Update caches since we skipped doing this after the deletions
+        # (removing frames also updates the caches)
+        if lfs_to_remove:
+            context.labels.remove_frames(lfs_to_remove)
+        else:
+            context.labels.update_cache()
 
     @classmethod
     def do_action(cls, context: CommandContext, params: dict):
@@ -2268,16 +2787,13 @@ class InstanceDeleteCommand(EditCommand):
 
 
 class DeleteAllPredictions(InstanceDeleteCommand):
+    undo_strategy = "snapshot"
+
     @staticmethod
     def get_frame_instance_list(
         context: CommandContext, params: dict
     ) -> List[Tuple[LabeledFrame, Instance]]:
-        return [
-            (lf, inst)
-            for lf in context.labels
-            for inst in lf
-            if type(inst) == PredictedInstance
-        ]
+        return InstanceDeleteCommand._get_predicted_instances(context.labels)
 
 
 class DeleteFramePredictions(InstanceDeleteCommand):
@@ -2288,30 +2804,21 @@ class DeleteFramePredictions(InstanceDeleteCommand):
 
     @staticmethod
     def get_frame_instance_list(context: CommandContext, params: dict):
-        predicted_instances = [
-            (lf, inst)
-            for lf in context.labels.find(
+        return InstanceDeleteCommand._get_predicted_instances(
+            context.labels.find(
                 context.state["video"], frame_idx=context.state["frame_idx"]
             )
-            for inst in lf
-            if type(inst) == PredictedInstance
-        ]
-
-        return predicted_instances
+        )
 
 
 class DeleteClipPredictions(InstanceDeleteCommand):
     @staticmethod
     def get_frame_instance_list(context: CommandContext, params: dict):
-        predicted_instances = [
-            (lf, inst)
-            for lf in context.labels.find(
+        return InstanceDeleteCommand._get_predicted_instances(
+            context.labels.find(
                 context.state["video"], frame_idx=range(*context.state["frame_range"])
             )
-            for inst in lf
-            if type(inst) == PredictedInstance
-        ]
-        return predicted_instances
+        )
 
 
 class DeleteAreaPredictions(InstanceDeleteCommand):
@@ -2320,24 +2827,30 @@ class DeleteAreaPredictions(InstanceDeleteCommand):
         min_corner = params["min_corner"]
         max_corner = params["max_corner"]
 
-        def is_bounded(inst):
-            points_array = inst.points_array
-            valid_points = points_array[~np.isnan(points_array).any(axis=1)]
-
-            is_gt_min = np.all(valid_points >= min_corner)
-            is_lt_max = np.all(valid_points <= max_corner)
-            return is_gt_min and is_lt_max
+        predicted_instances = InstanceDeleteCommand._get_predicted_instances(
+            context.labels.find(context.state["video"])
+        )
+        if not predicted_instances:
+            return predicted_instances
+
+        # Check the points of all instances at once, rather than per instance
+        points = [inst.points_array for _, inst in predicted_instances]
+        inst_idxs = np.repeat(np.arange(len(points)), [len(pts) for pts in points])
+        points = np.concatenate(points)
+
+        is_valid = ~np.isnan(points).any(axis=1)
+        is_inside = np.all((points >= min_corner) & (points <= max_corner), axis=1)
+        outside_counts = np.bincount(
+            inst_idxs, weights=is_valid & ~is_inside, minlength=len(predicted_instances)
+        )
 
         # Find all instances contained in selected area
-        predicted_instances = [
-            (lf, inst)
-            for lf in context.labels.find(context.state["video"])
-            for inst in lf
-            if type(inst) == PredictedInstance and is_bounded(inst)
+        return [
+            lf_inst
+            for lf_inst, outside_count in zip(predicted_instances, outside_counts)
+            if outside_count == 0
         ]
 
-        return predicted_instances
-
     @classmethod
     def ask_and_do(cls, context: CommandContext, params: dict):
         # Callback to delete after area has been selected
@@ -2368,13 +2881,12 @@ class DeleteLowScorePredictions(InstanceDeleteCommand):
     @staticmethod
     def get_frame_instance_list(context: CommandContext, params: dict):
         score_thresh = params["score_threshold"]
-        predicted_instances = [
-            (lf, inst)
-            for lf in context.labels.find(context.state["video"])
-            for inst in lf
-            if type(inst) == PredictedInstance and inst.score < score_thresh
+        predicted_instances = InstanceDeleteCommand._get_predicted_instances(
+            context.labels.find(context.state["video"])
+        )
+        return [
+            (lf, inst) for lf, inst in predicted_instances if inst.score < score_thresh
         ]
-        return predicted_instances
 
     @classmethod
     def ask(cls, context: CommandContext, params: dict) -> bool:
@@ -2393,11 +2905,13 @@ class DeleteFrameLimitPredictions(InstanceDeleteCommand):
         predicted_instances = []
         # Find all instances contained in selected area
         for lf in context.labels.find(context.state["video"]):
-            if len(lf.predicted_instances) > count_thresh:
+            lf_predicted_instances = lf.predicted_instances
+            n_extra = len(lf_predicted_instances) - count_thresh
+            if n_extra > 0:
                 # Get all but the count_thresh many instances with the highest score
-                extra_instances = sorted(
-                    lf.predicted_instances, key=operator.attrgetter("score")
-                )[:-count_thresh]
+                extra_instances = heapq.nsmallest(
+                    n_extra, lf_predicted_instances, key=operator.attrgetter("score")
+                )
                 predicted_instances.extend([(lf, inst) for inst in extra_instances])
         return predicted_instances
 
@@ -2464,6 +2978,23 @@ class TransposeInstances(EditCommand):
 
 class DeleteSelectedInstance(EditCommand):
     topics = [UpdateTopic.frame, UpdateTopic.project_instances, UpdateTopic.suggestions]
+    undo_strategy = "patch"
+
+    @staticmethod
+    def inverse(context: CommandContext, params: dict) -> List[dict]:
+        selected_inst = context.state["instance"]
+        if selected_inst is None:
+            return []
+
+        lf = context.state["labeled_frame"]
+        return [
+            {
+                "op": "add",
+                "path": ("frame", lf, "instances"),
+                "index": lf.instances.index(selected_inst),
+                "value": selected_inst,
+            }
+        ]
 
     @staticmethod
     def do_action(context: CommandContext, params: dict):
@@ -2488,14 +3019,19 @@ class DeleteSelectedInstanceTrack(EditCommand):
             return
 
         track = selected_inst.track
-        context.labels.remove_instance(context.state["labeled_frame"], selected_inst)
+        lf_inst_list = [(context.state["labeled_frame"], selected_inst)]
 
         if track is not None:
             # remove any instance on this track
-            for lf in context.labels.find(context.state["video"]):
-                track_instances = filter(lambda inst: inst.track == track, lf.instances)
-                for inst in track_instances:
-                    context.labels.remove_instance(lf, inst)
+            lf_inst_list.extend(
+                (lf, inst)
+                for lf in context.labels.find(context.state["video"])
+                for inst in lf.instances
+                if inst.track is track
+            )
+
+        # Remove all at once, only updating the cache for the removed instances
+        context.labels.remove_instances(lf_inst_list)
 
 
 class DeleteDialogCommand(EditCommand):
@@ -2505,6 +3041,8 @@ class DeleteDialogCommand(EditCommand):
 
     @staticmethod
     def ask_and_do(context: CommandContext, params: dict):
+        from sleap.gui.dialogs.delete import DeleteDialog
+
         if DeleteDialog(context).exec_():
             context.signal_update([UpdateTopic.project_instances])
 
@@ -2514,9 +3052,9 @@ class AddTrack(EditCommand):
 
     @staticmethod
     def do_action(context: CommandContext, params: dict):
-        track_numbers_used = [
+        track_numbers_used = (
             int(track.name) for track in context.labels.tracks if track.name.isnumeric()
-        ]
+        )
         next_number = max(track_numbers_used, default=0) + 1
         new_track = Track(spawned_on=context.state["frame_idx"], name=str(next_number))
 
@@ -2542,16 +3080,11 @@ class SetSelectedInstanceTrack(EditCommand):
             or not context.state["propagate track labels"]
         ):
             # Move anything already in the new track out of it
-            new_track_instances = context.labels.find_track_occupancy(
+            context.labels.clear_track_at(
                 video=context.state["video"],
                 track=new_track,
-                frame_range=(
-                    context.state["frame_idx"],
-                    context.state["frame_idx"] + 1,
-                ),
+                frame_idx=context.state["frame_idx"],
             )
-            for instance in new_track_instances:
-                instance.track = None
             # Move selected instance into new track
             context.labels.track_set_instance(
                 context.state["labeled_frame"], selected_instance, new_track
@@ -2655,21 +3188,106 @@ class SetTrackName(EditCommand):
         track.name = name
 
 
+class SuggestionsWorker(QtCore.QRunnable):
+    """Generates suggestions in a background thread.
+
+    The worker is given a snapshot of the labels (see `snapshot_labels`) so
+    that the labels can still be edited in the GUI while it runs.
+
+    While running, `signals.progress` is emitted with the number of videos done
+    and the total number of videos. When done, `signals.finished` is emitted
+    with the list of suggestions (or `signals.failed` with the exception if
+    something went wrong). If `cancelled` is set, the worker stops after the
+    current video and `signals.finished` is emitted with an empty list.
+    """
+
+    class Signals(QtCore.QObject):
+        progress = QtCore.Signal(int, int)
+        finished = QtCore.Signal(list)
+        failed = QtCore.Signal(object)
+
+    class Cancelled(Exception):
+        pass
+
+    def __init__(self, labels: Labels, params: dict):
+        super(SuggestionsWorker, self).__init__()
+        self.labels = self.snapshot_labels(labels, params["videos"])
+        self.params = params
+        self.signals = self.Signals()
+        self.cancelled = False
+
+    @staticmethod
+    def snapshot_labels(labels: Labels, videos: List[Video]) -> Labels:
+        """Returns copy of labels with the data used to generate suggestions.
+
+        Frames and instances in the given videos are copied (along with the
+        lists of videos, skeletons, tracks and suggestions) so that they aren't
+        changed by edits while suggestions are generated. The videos, skeletons
+        and tracks themselves are shared with `labels`, so the suggestions are
+        for the same videos.
+        """
+        videos = set(videos)
+        labeled_frames = [
+            LabeledFrame(
+                video=lf.video,
+                frame_idx=lf.frame_idx,
+                instances=[
+                    attr.evolve(
+                        inst,
+                        points=inst.get_points_array(copy=False, full=True).copy(),
+                        frame=None,
+                    )
+                    for inst in lf.instances
+                ],
+            )
+            for lf in labels.labeled_frames
+            if lf.video in videos
+        ]
+        return Labels(
+            labeled_frames=labeled_frames,
+            videos=list(labels.videos),
+            skeletons=list(labels.skeletons),
+            nodes=list(labels.nodes),
+            tracks=list(labels.tracks),
+            suggestions=list(labels.suggestions),
+        )
+
+    def _on_progress(self, n_done: int, n_total: int):
+        if self.cancelled:
+            raise self.Cancelled()
+        self.signals.progress.emit(n_done, n_total)
+
+    def run(self):
+        from sleap.gui.suggestions import VideoFrameSuggestions
+
+        try:
+            if self.cancelled:
+                raise self.Cancelled()
+            suggestions = VideoFrameSuggestions.suggest(
+                labels=self.labels,
+                params=self.params,
+                progress_callback=self._on_progress,
+            )
+        except self.Cancelled:
+            self.signals.finished.emit([])
+        except Exception as e:
+            self.signals.failed.emit(e)
+        else:
+            self.signals.finished.emit(suggestions)
+
+
 class GenerateSuggestions(EditCommand):
     topics = [UpdateTopic.suggestions]
 
-    @classmethod
-    def do_action(cls, context: CommandContext, params: dict):
-
+    @staticmethod
+    def ask(context: CommandContext, params: dict) -> bool:
         if len(context.labels.videos) == 0:
             print("Error: no videos to generate suggestions for")
-            return
+            return False
 
-        # TODO: Progress bar
-        win = MessageDialog(
-            "Generating list of suggested frames... " "This may take a few minutes.",
-            context.app,
-        )
+        if context._suggestions_worker is not None:
+            # Already generating suggestions, so don't start again
+            return False
 
         if (
             params["target"]
@@ -2683,22 +3301,62 @@ class GenerateSuggestions(EditCommand):
         else:
             params["videos"] = context.labels.videos
 
-        try:
-            new_suggestions = VideoFrameSuggestions.suggest(
-                labels=context.labels, params=params
-            )
+        return True
+
+    @classmethod
+    def do_action(cls, context: CommandContext, params: dict):
+        # Progress is indeterminate until the first video is done, and the
+        # dialog is only shown if generating suggestions takes a while
+        win = QProgressDialog(
+            "Generating list of suggested frames... This may take a few minutes.",
+            "Cancel",
+            0,
+            0,
+            context.app,
+        )
+        win.setWindowTitle("Generate Suggestions")
+        win.setMinimumDuration(200)
+        win.setAutoClose(False)
+        win.setAutoReset(False)
+
+        def on_progress(n_done: int, n_total: int):
+            win.setMaximum(n_total)
+            win.setValue(n_done)
+
+        def on_canceled():
+            # Stops after the current video, anything generated is discarded
+            worker.cancelled = True
+            win.hide()
 
+        def on_finished(new_suggestions: list):
+            context._suggestions_worker = None
+            win.hide()
+            if worker.cancelled:
+                return
             context.labels.append_suggestions(new_suggestions)
-        except Exception as e:
+            context.signal_update([UpdateTopic.suggestions])
+
+        def on_failed(e: Exception):
+            context._suggestions_worker = None
             win.hide()
+            if worker.cancelled:
+                return
+            logger.error("Error generating suggestions.", exc_info=e)
             QtWidgets.QMessageBox(
                 text=f"An error occurred while generating suggestions. "
                 "Your command line terminal may have more information about "
                 "the error."
             ).exec_()
-            raise e
 
-        win.hide()
+        # Generate suggestions in another thread (from a snapshot of the labels)
+        # so the GUI stays responsive, results are added back on the GUI thread.
+        worker = SuggestionsWorker(labels=context.labels, params=dict(params))
+        worker.signals.progress.connect(on_progress, QtCore.Qt.QueuedConnection)
+        worker.signals.finished.connect(on_finished, QtCore.Qt.QueuedConnection)
+        worker.signals.failed.connect(on_failed, QtCore.Qt.QueuedConnection)
+        win.canceled.connect(on_canceled)
+        context._suggestions_worker = worker
+        QtCore.QThreadPool.globalInstance().start(worker)
 
 
 class AddSuggestion(EditCommand):
@@ -2752,41 +3410,99 @@ class ClearSuggestions(EditCommand):
 
 class MergeProject(EditCommand):
     topics = [UpdateTopic.all]
+    undo_strategy = "snapshot"
+    file_filter = ";;".join(
+        [
+            "SLEAP HDF5 dataset (*.slp *.h5 *.hdf5)",
+            "SLEAP JSON dataset (*.json *.json.zip)",
+        ]
+    )
 
     @classmethod
     def ask_and_do(cls, context: CommandContext, params: dict):
+        from sleap.gui.dialogs.merge import MergeDialog
+
         filenames = params["filenames"]
         if filenames is None:
-            filters = [
-                "SLEAP HDF5 dataset (*.slp *.h5 *.hdf5)",
-                "SLEAP JSON dataset (*.json *.json.zip)",
-            ]
-
             filenames, selected_filter = FileDialog.openMultiple(
                 context.app,
-                dir=None,
+                dir=context.last_dir,
                 caption="Import labeled data...",
-                filter=";;".join(filters),
+                filter=MergeProject.file_filter,
             )
 
         if len(filenames) == 0:
             return
 
-        for filename in filenames:
-            gui_video_callback = Labels.make_gui_video_callback(
-                search_paths=[os.path.dirname(filename)]
-            )
+        context.last_dir = os.path.dirname(filenames[0])
+
+        # Labels are modified by the MergeDialog, so take snapshot before merging
+        params["undo_snapshot"] = LabelsSnapshot.from_labels(context.labels)
 
-            new_labels = Labels.load_file(filename, video_search=gui_video_callback)
+        # Start loading all of the files in the background, then merge them (in
+        # order) as they become available
+        has_merged = False
+        try:
+            with ThreadPoolExecutor(max_workers=min(4, len(filenames))) as executor:
+                futures = [
+                    executor.submit(cls._load_labels_if_videos_found, filename)
+                    for filename in filenames
+                ]
+
+                for filename, future in zip(filenames, futures):
+                    try:
+                        new_labels = future.result()
+                        if new_labels is None:
+                            # Videos need to be located, which may require asking
+                            # the user, so we have to load the file here in the
+                            # GUI thread
+                            gui_video_callback = Labels.make_gui_video_callback(
+                                search_paths=[os.path.dirname(filename)]
+                            )
+
+                            new_labels = Labels.load_file(
+                                filename, video_search=gui_video_callback
+                            )
+                    except Exception as e:
+                        # Still merge any other files
+                        logger.error(f"Unable to load {filename}.", exc_info=e)
+                        QtWidgets.QMessageBox(
+                            text=f"Unable to load {filename}."
+                        ).exec_()
+                        continue
+
+                    # Merging data is handled by MergeDialog (which starts merging
+                    # into the base labels as soon as it's created)
+                    has_merged = True
+                    MergeDialog(
+                        base_labels=context.labels, new_labels=new_labels
+                    ).exec_()
+        finally:
+            # Record the change even if merging a later file failed
+            if has_merged:
+                cls.do_with_signal(context, params)
 
-            # Merging data is handled by MergeDialog
-            MergeDialog(base_labels=context.labels, new_labels=new_labels).exec_()
+    @staticmethod
+    def _load_labels_if_videos_found(filename: str) -> Optional[Labels]:
+        """Loads labels file, or returns None if any videos can't be found.
 
-        cls.do_with_signal(context, params)
+        This doesn't show any dialogs, so it's safe to call from a worker thread.
+        """
+
+        def video_callback(video_list: List[dict]):
+            video_filenames = [item["backend"]["filename"] for item in video_list]
+            if any(not os.path.exists(path) for path in video_filenames):
+                raise FileNotFoundError
+
+        try:
+            return Labels.load_file(filename, video_search=video_callback)
+        except FileNotFoundError:
+            return None
 
 
 class AddInstance(EditCommand):
     topics = [UpdateTopic.frame, UpdateTopic.project_instances, UpdateTopic.suggestions]
+    undo_strategy = "patch"
 
     @staticmethod
     def get_previous_frame_index(context: CommandContext) -> Optional[int]:
@@ -2796,12 +3512,38 @@ class AddInstance(EditCommand):
             reverse=True,
         )
 
-        try:
-            next_idx = next(frames).frame_idx
-        except:
+        prev_frame = next(frames, None)
+        if prev_frame is None:
             return
 
-        return next_idx
+        return prev_frame.frame_idx
+
+    @staticmethod
+    def ask(context: CommandContext, params: dict) -> bool:
+        # Nothing to add (or undo) without a frame or nodes for the instance
+        if context.state["labeled_frame"] is None:
+            return False
+
+        if len(context.state["skeleton"]) == 0:
+            return False
+
+        return True
+
+    @staticmethod
+    def inverse(context: CommandContext, params: dict) -> List[dict]:
+        lf = context.state["labeled_frame"]
+
+        # The new instance will be appended to the instances in the frame
+        patches = [
+            {
+                "op": "remove",
+                "path": ("frame", lf, "instances"),
+                "index": len(lf.instances),
+            }
+        ]
+        if lf not in context.labels.labels:
+            patches.append({"op": "remove", "path": ("labels", "frames"), "value": lf})
+        return patches
 
     @classmethod
     def do_action(cls, context: CommandContext, params: dict):
@@ -2810,12 +3552,6 @@ class AddInstance(EditCommand):
         location = params.get("location", None)
         mark_complete = params.get("mark_complete", False)
 
-        if context.state["labeled_frame"] is None:
-            return
-
-        if len(context.state["skeleton"]) == 0:
-            return
-
         from_predicted = copy_instance
         from_prev_frame = False
 
@@ -2844,9 +3580,10 @@ class AddInstance(EditCommand):
             prev_idx = cls.get_previous_frame_index(context)
 
             if prev_idx is not None:
-                prev_instances = context.labels.find(
-                    context.state["video"], prev_idx, return_new=True
-                )[0].instances
+                prev_lf = context.labels.find_first(
+                    context.state["video"], prev_idx, use_cache=True
+                )
+                prev_instances = prev_lf.instances if prev_lf is not None else []
                 if len(prev_instances) > len(context.state["labeled_frame"].instances):
                     # If more instances in previous frame than current, then use the
                     # first unmatched instance.
@@ -2874,26 +3611,38 @@ class AddInstance(EditCommand):
             frame=context.state["labeled_frame"],
         )
 
-        has_missing_nodes = False
+        has_missing_nodes = True
 
-        # go through each node in skeleton
-        for node in context.state["skeleton"].node_names:
-            # if we're copying from a skeleton that has this node
-            if (
-                copy_instance is not None
-                and node in copy_instance
-                and not copy_instance[node].isnan()
-            ):
-                # just copy x, y, and visible
-                # we don't want to copy a PredictedPoint or score attribute
-                new_instance[node] = Point(
-                    x=copy_instance[node].x,
-                    y=copy_instance[node].y,
-                    visible=copy_instance[node].visible,
-                    complete=mark_complete,
-                )
+        if copy_instance is not None:
+            # match nodes in skeleton to nodes (by name) in the copied instance
+            node_names = context.state["skeleton"].node_names
+            if copy_instance.skeleton is context.state["skeleton"]:
+                copy_idxs = np.arange(len(node_names))
             else:
-                has_missing_nodes = True
+                copy_node_names = copy_instance.skeleton.node_names
+                copy_idxs = np.array(
+                    [
+                        copy_node_names.index(node) if node in copy_node_names else -1
+                        for node in node_names
+                    ],
+                    dtype=int,
+                )
+            node_idxs = np.flatnonzero(copy_idxs >= 0)
+            copy_idxs = copy_idxs[node_idxs]
+
+            # just copy x, y, and visible for the points which aren't missing
+            # we don't want to copy a PredictedPoint or score attribute
+            copy_points = copy_instance.get_points_array(copy=False, full=True)
+            xy = np.stack([copy_points["x"], copy_points["y"]], axis=1)[copy_idxs]
+            is_copied = ~np.isnan(xy).any(axis=1)
+            new_instance.set_points_bulk(
+                xy[is_copied],
+                visible=copy_points["visible"][copy_idxs][is_copied],
+                complete=mark_complete,
+                node_idxs=node_idxs[is_copied],
+            )
+
+            has_missing_nodes = is_copied.sum() < len(node_names)
 
         if has_missing_nodes:
             # mark the node as not "visible" if we're copying from a predicted instance without this node
@@ -2948,6 +3697,20 @@ class SetInstancePointLocations(EditCommand):
     """
 
     topics = []
+    undo_strategy = "patch"
+
+    @staticmethod
+    def inverse(context: "CommandContext", params: dict) -> List[dict]:
+        instance = params["instance"]
+        return [
+            {
+                "op": "replace",
+                "path": ("instance", instance, "points", node),
+                "value": (instance[node].x, instance[node].y),
+            }
+            for node in params["nodes_locations"]
+            if node in instance
+        ]
 
     @classmethod
     def do_action(cls, context: "CommandContext", params: dict):
@@ -2987,6 +3750,12 @@ class SetInstancePointVisibility(EditCommand):
 class AddMissingInstanceNodes(EditCommand):
     topics = [UpdateTopic.frame]
 
+    # Force-directed layouts by skeleton, with the nodes/edges they're for (entries
+    # are dropped when the skeleton is garbage collected)
+    _force_directed_layouts: MutableMapping[
+        Skeleton, Tuple[tuple, np.ndarray]
+    ] = weakref.WeakKeyDictionary()
+
     @classmethod
     def do_action(cls, context: CommandContext, params: dict):
         instance = params["instance"]
@@ -2996,34 +3765,65 @@ class AddMissingInstanceNodes(EditCommand):
 
     @classmethod
     def add_best_nodes(cls, context, instance, visible):
+        # Nothing to do if the instance already has all of its points
+        missing = instance.missing_mask()
+        if not missing.any():
+            return
+
+        # Get the rect that's currently visible in the window view once for both
+        # placement methods
+        view_rect = context.app.player.getVisibleRect()
+
         # Try placing missing nodes using a "template" instance
-        cls.add_nodes_from_template(context, instance, visible)
+        cls.add_nodes_from_template(
+            context, instance, visible, view_rect=view_rect, missing=missing
+        )
 
         # If the "template" instance has missing nodes (i.e., a node that isn't
         # labeled on any of the instances we used to generate the template),
         # then adding nodes from the template may still result in missing nodes.
         # So we'll use random placement for anything that's still missing.
-        cls.add_random_nodes(context, instance, visible)
+        cls.add_random_nodes(context, instance, visible, view_rect=view_rect)
 
     @classmethod
-    def add_random_nodes(cls, context, instance, visible):
+    def add_random_nodes(
+        cls, context, instance, visible, view_rect: Optional[QtCore.QRectF] = None
+    ):
+        if not instance.missing_mask().any():
+            return
+
         # TODO: Move this to Instance so we can do this on-demand
-        # the rect that's currently visible in the window view
-        in_view_rect = context.app.player.getVisibleRect()
+        # the rect that's currently visible in the window view (Qt rects are
+        # falsy when empty, so check for None)
+        in_view_rect = view_rect
+        if in_view_rect is None:
+            in_view_rect = context.app.player.getVisibleRect()
+
+        # pick random points within currently zoomed view (one per node, only the
+        # ones for missing nodes are used)
+        xy = cls.get_xy_in_rect(
+            in_view_rect, n=len(instance.skeleton.nodes), rng=context._rng
+        )
 
-        for node in context.state["skeleton"].nodes:
-            if node not in instance.nodes or instance[node].isnan():
-                # pick random points within currently zoomed view
-                x, y = cls.get_xy_in_rect(in_view_rect)
-                # set point for node
-                instance[node] = Point(x=x, y=y, visible=visible)
+        # set points for missing nodes
+        instance.set_missing_from_xy(xy, visible=visible)
 
     @staticmethod
-    def get_xy_in_rect(rect: QtCore.QRectF):
-        """Returns random x, y coordinates within given rect."""
-        x = rect.x() + (rect.width() * 0.1) + (np.random.rand() * rect.width() * 0.8)
-        y = rect.y() + (rect.height() * 0.1) + (np.random.rand() * rect.height() * 0.8)
-        return x, y
+    def get_xy_in_rect(
+        rect: QtCore.QRectF, n: int = 1, rng: Optional[np.random.Generator] = None
+    ) -> np.ndarray:
+        """Returns (n, 2) array of random x, y coordinates within given rect."""
+        # Points are placed within the middle 80% of the rect
+        width, height = rect.width(), rect.height()
+        offset = np.array([rect.x() + width * 0.1, rect.y() + height * 0.1])
+        scale = np.array([width * 0.8, height * 0.8])
+
+        if rng is None:
+            rng = np.random.default_rng()
+        xy = rng.random((n, 2))
+        xy *= scale
+        xy += offset
+        return xy
 
     @staticmethod
     def get_rect_center_xy(rect: QtCore.QRectF):
@@ -3036,49 +3836,97 @@ class AddMissingInstanceNodes(EditCommand):
         instance,
         visible: bool = False,
         center_point: QtCore.QPoint = None,
+        view_rect: Optional[QtCore.QRectF] = None,
+        missing: Optional[np.ndarray] = None,
     ):
-        from sleap.info import align
+        if missing is None:
+            missing = instance.missing_mask()
+        if not missing.any():
+            return
 
-        # Get the "template" instance
-        template_points = context.labels.get_template_instance_points(
-            skeleton=instance.skeleton
-        )
+        skeleton = instance.skeleton
 
-        # Align the template on to the current instance with missing points
-        if instance.points:
+        # Align the "template" instance on to the current instance with missing
+        # points
+        if not missing.all():
+            template_points = context.labels.get_template_instance_points(
+                skeleton=skeleton
+            )
             aligned_template = align.align_instance_points(
                 source_points_array=template_points,
                 target_points_array=instance.points_array,
             )
         else:
-            template_mean = np.nanmean(template_points, axis=0)
+            template_centered = context.labels.get_template_instance_points(
+                skeleton=skeleton, centered=True
+            )
 
-            center_point = center_point or context.app.player.getVisibleRect().center()
+            if center_point is None:
+                if view_rect is None:
+                    view_rect = context.app.player.getVisibleRect()
+                center_point = view_rect.center()
             center = np.array([center_point.x(), center_point.y()])
 
-            aligned_template = template_points + (center - template_mean)
+            aligned_template = template_centered + center
 
         # Make missing points from the aligned template
-        for i, node in enumerate(instance.skeleton.nodes):
-            if node not in instance:
-                x, y = aligned_template[i]
-                instance[node] = Point(x=x, y=y, visible=visible)
+        instance.set_missing_from_xy(aligned_template, visible=visible)
 
     @classmethod
     def add_force_directed_nodes(
         cls, context, instance, visible, center_point: QtCore.QPoint = None
     ):
-        import networkx as nx
+        skeleton = context.state["skeleton"]
+        nodes = skeleton.nodes
+        if not nodes:
+            return
+
+        if center_point is None:
+            center_point = context.app.player.getVisibleRect().center()
+        center = np.array([center_point.x(), center_point.y()])
+
+        xy = cls.get_force_directed_layout(skeleton) + center
+
+        # Write all of the positions into the instance in one go
+        instance_nodes = instance.skeleton.nodes
+        if instance_nodes == nodes:
+            node_idxs = None
+        else:
+            name_to_index = {node.name: i for i, node in enumerate(instance_nodes)}
+            node_idxs = np.array([name_to_index[node.name] for node in nodes])
+        instance.set_points_bulk(xy, visible=visible, node_idxs=node_idxs)
 
-        center_point = center_point or context.app.player.getVisibleRect().center()
-        center_tuple = (center_point.x(), center_point.y())
+    @classmethod
+    def get_force_directed_layout(cls, skeleton: Skeleton) -> np.ndarray:
+        """Returns (cached) force-directed layout of skeleton nodes around origin.
 
-        node_positions = nx.spring_layout(
-            G=context.state["skeleton"].graph, center=center_tuple, scale=50
+        The layout is cached per skeleton and recomputed if its nodes or edges
+        change.
+        """
+        nodes = skeleton.nodes
+        edges = skeleton.edges
+        key = (
+            tuple(id(node) for node in nodes),
+            tuple((id(src), id(dst)) for src, dst in edges),
         )
 
-        for node, pos in node_positions.items():
-            instance[node] = Point(x=pos[0], y=pos[1], visible=visible)
+        cached = cls._force_directed_layouts.get(skeleton, None)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        # Imports scipy, so only import it when needed
+        from sleap.info.layout import get_force_directed_layout
+
+        # Only build the adjacency matrix when the skeleton is new or has changed
+        node_to_index = {node: i for i, node in enumerate(nodes)}
+        adjacency = np.zeros((len(nodes), len(nodes)), dtype="float32")
+        for src, dst in edges:
+            src_ind, dst_ind = node_to_index[src], node_to_index[dst]
+            adjacency[src_ind, dst_ind] = adjacency[dst_ind, src_ind] = 1.0
+
+        layout = get_force_directed_layout(adjacency, scale=50)
+        cls._force_directed_layouts[skeleton] = (key, layout)
+        return layout
 
 
 class AddUserInstancesFromPredictions(EditCommand):
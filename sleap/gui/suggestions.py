@@ -6,7 +6,7 @@ import attr
 import numpy as np
 import random
 
-from typing import Dict, List, Optional, Union
+from typing import Callable, Dict, List, Optional, Union
 
 from sleap.io.video import Video
 from sleap.info.feature_suggestions import (
@@ -40,7 +40,12 @@ class VideoFrameSuggestions(object):
     """
 
     @classmethod
-    def suggest(cls, params: dict, labels: "Labels" = None) -> List[SuggestionFrame]:
+    def suggest(
+        cls,
+        params: dict,
+        labels: "Labels" = None,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+    ) -> List[SuggestionFrame]:
         """
         This is the main entry point for generating lists of suggested frames.
 
@@ -49,6 +54,9 @@ class VideoFrameSuggestions(object):
                 suggestions, minimally this will have a "method" key with
                 the name of one of the class methods.
             labels: A `Labels` object for which we are generating suggestions.
+            progress_callback: If given, methods which process videos one at
+                a time call this with the number of videos done and the total
+                number of videos after each video.
 
         Returns:
             List of `SuggestionFrame` objects.
@@ -65,7 +73,9 @@ class VideoFrameSuggestions(object):
 
         method = str.replace(params["method"], " ", "_")
         if method_functions.get(method, None) is not None:
-            return method_functions[method](labels=labels, **params)
+            return method_functions[method](
+                labels=labels, progress_callback=progress_callback, **params
+            )
         else:
             raise ValueError(
                 f"No {'' if method == '_' else method + ' '}method found for "
@@ -81,6 +91,7 @@ class VideoFrameSuggestions(object):
         videos: List[Video],
         per_video: int = 20,
         sampling_method: str = "random",
+        progress_callback: Optional[Callable[[int, int], None]] = None,
         **kwargs,
     ):
         """Method to generate suggestions randomly or by taking strides through video."""
@@ -90,7 +101,7 @@ class VideoFrameSuggestions(object):
         for sugg in labels.suggestions:
             sugg_idx_dict[sugg.video].append(sugg.frame_idx)
 
-        for video in videos:
+        for i, video in enumerate(videos):
             # Get unique sample space
             vid_idx = list(range(video.frames))
             vid_sugg_idx = sugg_idx_dict[video]
@@ -115,6 +126,8 @@ class VideoFrameSuggestions(object):
             suggestions.extend(
                 cls.idx_list_to_frame_list(vid_suggestions, video, group)
             )
+            if progress_callback is not None:
+                progress_callback(i + 1, len(videos))
 
         return suggestions
 
@@ -177,6 +190,7 @@ class VideoFrameSuggestions(object):
         score_limit,
         instance_limit_upper,
         instance_limit_lower,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
         **kwargs,
     ):
         """Method to generate suggestions for proofreading frames with low score."""
@@ -185,7 +199,7 @@ class VideoFrameSuggestions(object):
         instance_limit_lower = int(instance_limit_lower)
 
         proposed_suggestions = []
-        for video in videos:
+        for i, video in enumerate(videos):
             proposed_suggestions.extend(
                 cls._prediction_score_video(
                     video,
@@ -195,6 +209,8 @@ class VideoFrameSuggestions(object):
                     instance_limit_lower,
                 )
             )
+            if progress_callback is not None:
+                progress_callback(i + 1, len(videos))
 
         suggestions = VideoFrameSuggestions.filter_unique_suggestions(
             labels, videos, proposed_suggestions
@@ -244,6 +260,7 @@ class VideoFrameSuggestions(object):
         videos: List[Video],
         node: Union[int, str],
         threshold: float,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
         **kwargs,
     ):
         """Finds frames for proofreading with high node velocity."""
@@ -257,10 +274,12 @@ class VideoFrameSuggestions(object):
                 node_name = ""
 
         proposed_suggestions = []
-        for video in videos:
+        for i, video in enumerate(videos):
             proposed_suggestions.extend(
                 cls._velocity_video(video, labels, node_name, threshold)
             )
+            if progress_callback is not None:
+                progress_callback(i + 1, len(videos))
 
         suggestions = VideoFrameSuggestions.filter_unique_suggestions(
             labels, videos, proposed_suggestions
@@ -175,38 +175,37 @@ def make_mean_instance(
 
 
 def align_instance_points(source_points_array, target_points_array):
-    """Transforms source for best fit on to target."""
+    """Transforms source for best fit on to target.
 
-    # Find (furthest) pair of points in target to use for alignment
-    pairwise_distances = np.linalg.norm(
-        target_points_array[:, np.newaxis, :] - target_points_array[np.newaxis, :, :],
-        axis=-1,
-    )
-    node_a, node_b = np.unravel_index(
-        np.nanargmax(pairwise_distances), shape=pairwise_distances.shape
-    )
-
-    # Align source to target
-    source_line = source_points_array[node_a] - source_points_array[node_b]
-    target_line = target_points_array[node_a] - target_points_array[node_b]
-
-    source_theta = np.arctan2(source_line[1], source_line[0])
-    target_theta = np.arctan2(target_line[1], target_line[0])
-
-    rotation_theta = source_theta - target_theta
-    c, s = np.cos(rotation_theta), np.sin(rotation_theta)
-    R = np.array([[c, -s], [s, c]])
-
-    rotated = source_points_array.dot(R)
+    Finds the rotation and shift which minimize the squared distance between
+    the points which are present in both source and target (using SVD).
+    """
+    source_points_array = np.asarray(source_points_array, dtype="float64")
+    target_points_array = np.asarray(target_points_array, dtype="float64")
 
-    # Shift source to minimize total point different from target
-    target_row_mask = ~np.isnan(target_points_array)[:, 0]
-    shift = np.mean(
-        rotated[target_row_mask] - target_points_array[target_row_mask], axis=0
+    both_mask = np.all(np.isfinite(source_points_array), axis=1) & np.all(
+        np.isfinite(target_points_array), axis=1
     )
-    rotated -= shift
-
-    return rotated
+    if not np.any(both_mask):
+        return source_points_array.copy()
+
+    source_points = source_points_array[both_mask]
+    target_points = target_points_array[both_mask]
+    source_mean = source_points.mean(axis=0)
+    target_mean = target_points.mean(axis=0)
+
+    # Without at least two points we can't determine a rotation, so just shift
+    if len(source_points) < 2:
+        return source_points_array - source_mean + target_mean
+
+    # Find best rotation of centered source on to centered target
+    H = (source_points - source_mean).T @ (target_points - target_mean)
+    U, _, Vt = np.linalg.svd(H)
+    # Don't allow reflections
+    d = np.sign(np.linalg.det(Vt.T @ U.T))
+    R = Vt.T @ np.diag([1.0, d]) @ U.T
+
+    return (source_points_array - source_mean) @ R.T + target_mean
 
 
 def get_instances_points(instances: List[Instance]) -> np.ndarray:
@@ -778,7 +778,8 @@ class Instance:
             if full:
                 parray = structured_to_unstructured(self._points)
             else:
-                parray = structured_to_unstructured(self._points[["x", "y"]])
+                # Faster than converting a multi-field view of the recarray
+                parray = np.stack([self._points["x"], self._points["y"]], axis=1)
 
             # Note that invisible_as_nan assumes copy is True.
             if invisible_as_nan:
@@ -786,6 +787,62 @@ class Instance:
 
             return parray
 
+    def set_points_bulk(
+        self,
+        xy: np.ndarray,
+        visible: Union[bool, np.ndarray] = True,
+        complete: Union[bool, np.ndarray] = False,
+        node_idxs: Optional[np.ndarray] = None,
+    ):
+        """Set the points for many nodes at once.
+
+        This writes directly into the underlying points array rather than
+        creating a :class:`Point` for each node.
+
+        Args:
+            xy: Array of shape `(n_points, 2)` with the x and y coordinates.
+            visible: Whether the points are visible, either a single value or an
+                array with a value for each point.
+            complete: Whether the points are complete, either a single value or
+                an array with a value for each point.
+            node_idxs: Indices (in the skeleton) of the nodes for the points. If
+                None, then `xy` must have a row for every node in the skeleton.
+        """
+        self._fix_array()
+        if node_idxs is None:
+            node_idxs = slice(None)
+
+        xy = np.asarray(xy)
+        self._points["x"][node_idxs] = xy[:, 0]
+        self._points["y"][node_idxs] = xy[:, 1]
+        self._points["visible"][node_idxs] = visible
+        self._points["complete"][node_idxs] = complete
+
+    def missing_mask(self) -> np.ndarray:
+        """Return a boolean mask of the skeleton nodes without points.
+
+        Returns:
+            A numpy array of shape `(n_nodes,)` which is True for nodes that don't
+            have a point in this instance (in the order of the skeleton nodes).
+        """
+        self._fix_array()
+        return np.isnan(self._points["x"]) | np.isnan(self._points["y"])
+
+    def set_missing_from_xy(self, xy: np.ndarray, visible: bool = False):
+        """Set the points for nodes that are missing from the instance.
+
+        Points which already have coordinates are left unchanged.
+
+        Args:
+            xy: Array of shape `(n_nodes, 2)` with x and y coordinates for every
+                node in the skeleton.
+            visible: Whether the added points are visible.
+        """
+        missing = self.missing_mask()
+        if missing.any():
+            xy = np.asarray(xy)
+            self.set_points_bulk(xy[missing], visible=visible, node_idxs=missing)
+
     def fill_missing(
         self, max_x: Optional[float] = None, max_y: Optional[float] = None
     ):
@@ -806,17 +863,19 @@ class Instance:
             y2 = np.nanmin([y2, max_y])
         w, h = y2 - y1, x2 - x1
 
-        for node in self.skeleton.nodes:
-            if node not in self.nodes or self[node].isnan():
-                off = np.array([w, h]) * np.random.rand(2)
-                x, y = off + np.array([x1, y1])
-                y, x = max(y, 0), max(x, 0)
-                if max_x is not None:
-                    x = min(x, max_x)
-                if max_y is not None:
-                    y = min(y, max_y)
-
-                self[node] = Point(x=x, y=y, visible=False)
+        missing = self.missing_mask()
+        n_missing = np.count_nonzero(missing)
+        if n_missing == 0:
+            return
+
+        off = np.array([w, h]) * np.random.rand(n_missing, 2)
+        xy = np.maximum(off + np.array([x1, y1]), 0)
+        if max_x is not None:
+            xy[:, 0] = np.minimum(xy[:, 0], max_x)
+        if max_y is not None:
+            xy[:, 1] = np.minimum(xy[:, 1], max_y)
+
+        self.set_points_bulk(xy, visible=False, node_idxs=missing)
 
     @property
     def points_array(self) -> np.ndarray:
@@ -49,6 +49,7 @@ from typing import (
     Tuple,
     Text,
     Iterable,
+    Iterator,
     Any,
     Set,
     Callable,
@@ -107,6 +108,8 @@ class LabelsDataCache:
         if new_frame is None:
             self._lf_by_video = {video: [] for video in self.labels.videos}
             self._frame_idx_map = dict()
+            self._sorted_frame_idxs = dict()
+            self._sorted_user_frame_idxs = dict()
             self._track_occupancy = dict()
             self._frame_count_cache = dict()
 
@@ -129,6 +132,8 @@ class LabelsDataCache:
                 self._frame_idx_map[new_vid] = dict()
             self._lf_by_video[new_vid].append(new_frame)
             self._frame_idx_map[new_vid][new_frame.frame_idx] = new_frame
+            self._sorted_frame_idxs.pop(new_vid, None)
+            self._sorted_user_frame_idxs.pop(new_vid, None)
 
     def find_frames(
         self, video: Video, frame_idx: Optional[Union[int, Iterable[int]]] = None
@@ -138,6 +143,17 @@ class LabelsDataCache:
             if video not in self._frame_idx_map:
                 return None
 
+            if isinstance(frame_idx, range) and frame_idx.step == 1:
+                # Only look up the labeled frames which are inside the range
+                frame_idxs = self.get_sorted_frame_idxs(video)
+                start, stop = np.searchsorted(
+                    frame_idxs, [frame_idx.start, frame_idx.stop]
+                )
+                return [
+                    self._frame_idx_map[video][idx]
+                    for idx in frame_idxs[start:stop].tolist()
+                ]
+
             if isinstance(frame_idx, Iterable):
                 return [
                     self._frame_idx_map[video][idx]
@@ -154,29 +170,64 @@ class LabelsDataCache:
                 return None
             return self._lf_by_video[video]
 
-    def find_fancy_frame_idxs(self, video, from_frame_idx, reverse):
-        """Return a list of frame idxs, with optional start position/order."""
+    def get_sorted_frame_idxs(
+        self, video: Video, user_only: bool = False
+    ) -> np.ndarray:
+        """Return (cached) sorted array of labeled frame idxs for video.
+
+        Args:
+            video: The `Video`.
+            user_only: If True, only include frames with user instances.
+        """
+        if not user_only:
+            if video not in self._sorted_frame_idxs:
+                frame_idx_map = self._frame_idx_map[video]
+                frame_idxs = np.fromiter(
+                    frame_idx_map.keys(), dtype=np.int64, count=len(frame_idx_map)
+                )
+                self._sorted_frame_idxs[video] = np.sort(frame_idxs)
+            return self._sorted_frame_idxs[video]
+
+        if video not in self._sorted_user_frame_idxs:
+            frame_idx_map = self._frame_idx_map[video]
+            frame_idxs = self.get_sorted_frame_idxs(video)
+            has_user = np.fromiter(
+                (frame_idx_map[idx].has_user_instances for idx in frame_idxs.tolist()),
+                dtype=bool,
+                count=len(frame_idxs),
+            )
+            self._sorted_user_frame_idxs[video] = frame_idxs[has_user]
+        return self._sorted_user_frame_idxs[video]
+
+    def find_fancy_frame_idxs(
+        self, video, from_frame_idx, reverse, user_only: bool = False
+    ) -> Optional[Iterator[int]]:
+        """Return an iterator over frame idxs, with optional start position/order.
+
+        The frame idxs start with the next frame after (or before, if reverse)
+        the specified frame and wrap around the end of the video. If user_only,
+        then only frames with user instances are included.
+        """
         if video not in self._frame_idx_map:
             return None
 
-        # Get sorted list of frame indexes for this video
-        frame_idxs = sorted(self._frame_idx_map[video].keys())
+        frame_idxs = self.get_sorted_frame_idxs(video, user_only=user_only)
+        n = len(frame_idxs)
+        if n == 0:
+            return iter(())
 
         # Find the next frame index after (before) the specified frame
         if not reverse:
-            next_frame_idx = min(
-                filter(lambda x: x > from_frame_idx, frame_idxs), default=frame_idxs[0]
-            )
+            cut_list_idx = np.searchsorted(frame_idxs, from_frame_idx, side="right")
+            if cut_list_idx == n:
+                cut_list_idx = 0
         else:
-            next_frame_idx = max(
-                filter(lambda x: x < from_frame_idx, frame_idxs), default=frame_idxs[-1]
-            )
-        cut_list_idx = frame_idxs.index(next_frame_idx)
+            cut_list_idx = np.searchsorted(frame_idxs, from_frame_idx, side="left") - 1
+            if cut_list_idx < 0:
+                cut_list_idx = n - 1
 
-        # Shift list of frame indices to start with specified frame
-        frame_idxs = frame_idxs[cut_list_idx:] + frame_idxs[:cut_list_idx]
-
-        return frame_idxs
+        # Shift frame indices to start with specified frame
+        return (int(frame_idxs[(cut_list_idx + i) % n]) for i in range(n))
 
     def _make_track_occupancy(self, video: Video) -> Dict[Video, RangeList]:
         """Build cached track occupancy data."""
@@ -216,6 +267,8 @@ class LabelsDataCache:
         if frame.video in self._frame_idx_map:
             if frame.frame_idx in self._frame_idx_map[frame.video]:
                 del self._frame_idx_map[frame.video][frame.frame_idx]
+        self._sorted_frame_idxs.pop(frame.video, None)
+        self._sorted_user_frame_idxs.pop(frame.video, None)
 
     def remove_video(self, video: Video):
         """Remove video and update cache as needed."""
@@ -223,6 +276,8 @@ class LabelsDataCache:
             del self._lf_by_video[video]
         if video in self._frame_idx_map:
             del self._frame_idx_map[video]
+        self._sorted_frame_idxs.pop(video, None)
+        self._sorted_user_frame_idxs.pop(video, None)
 
     def track_swap(
         self,
@@ -270,6 +325,7 @@ class LabelsDataCache:
 
     def remove_instance(self, frame: LabeledFrame, instance: Instance):
         """Remove an instance and update the cache as needed."""
+        self._sorted_user_frame_idxs.pop(frame.video, None)
         if instance.track not in self._track_occupancy[frame.video]:
             return
 
@@ -337,6 +393,9 @@ class LabelsDataCache:
         """
         video = frame.video
 
+        # The frame may have gained or lost its user instances
+        self._sorted_user_frame_idxs.pop(video, None)
+
         if video is None or video not in self._frame_count_cache:
             return
 
@@ -954,14 +1013,20 @@ class Labels(MutableSequence):
             in which case it contains a new `LabeledFrame` with
             `video` and `frame_index` set.
         """
-        null_result = (
-            [LabeledFrame(video=video, frame_idx=frame_idx)] if return_new else []
-        )
-
         result = self._cache.find_frames(video, frame_idx)
-        return null_result if result is None else result
+        if result is not None:
+            return result
+
+        # Only construct the new frame when we actually need to return it
+        return [LabeledFrame(video=video, frame_idx=frame_idx)] if return_new else []
 
-    def frames(self, video: Video, from_frame_idx: int = -1, reverse=False):
+    def frames(
+        self,
+        video: Video,
+        from_frame_idx: int = -1,
+        reverse: bool = False,
+        user_only: bool = False,
+    ):
         """Return an iterator over all labeled frames in a video.
 
         Args:
@@ -969,15 +1034,27 @@ class Labels(MutableSequence):
             from_frame_idx: The frame index from which we want to start.
                 Defaults to the first frame of video.
             reverse: Whether to iterate over frames in reverse order.
+            user_only: Whether to only include frames with user instances.
 
         Yields:
             :class:`LabeledFrame`
         """
-        frame_idxs = self._cache.find_fancy_frame_idxs(video, from_frame_idx, reverse)
+        frame_idxs = self._cache.find_fancy_frame_idxs(
+            video, from_frame_idx, reverse, user_only=user_only
+        )
+        if frame_idxs is None:
+            # No labeled frames in this video
+            return
 
         # Yield the frames
         for idx in frame_idxs:
-            yield self._cache._frame_idx_map[video][idx]
+            lf = self._cache._frame_idx_map[video][idx]
+            if user_only and not lf.has_user_instances:
+                # The cached index of frames with user instances isn't updated
+                # when instances are assigned to frames directly (e.g., by
+                # `remove_user_instances`), so check the frame itself
+                continue
+            yield lf
 
     def find_first(
         self, video: Video, frame_idx: Optional[int] = None, use_cache: bool = False
@@ -1172,7 +1249,19 @@ class Labels(MutableSequence):
                     if skeleton is None or instance.skeleton == skeleton:
                         yield instance
 
-    def get_template_instance_points(self, skeleton: Skeleton):
+    def get_template_instance_points(
+        self, skeleton: Skeleton, centered: bool = False
+    ) -> np.ndarray:
+        """Return (possibly cached) template points for the skeleton.
+
+        Args:
+            skeleton: The :class:`Skeleton` to get the template for.
+            centered: If True, return the template points shifted so that their
+                mean is at the origin. These are also cached.
+
+        Returns:
+            Array of shape `(n_nodes, 2)` with the template points.
+        """
         if not hasattr(self, "_template_instance_points"):
             self._template_instance_points = dict()
 
@@ -1217,7 +1306,17 @@ class Labels(MutableSequence):
                     points=template_points, nodes=skeleton.nodes
                 )
 
-        return self._template_instance_points[skeleton]["points"]
+        template = self._template_instance_points[skeleton]
+        points = template["points"]
+
+        if centered:
+            if "centered" not in template:
+                # Nodes which aren't in the template have NaN points
+                valid = ~np.isnan(points).any(axis=1)
+                template["centered"] = points - points[valid].mean(axis=0)
+            points = template["centered"]
+
+        return points
 
     def get_track_count(self, video: Video) -> int:
         """Return the number of occupied tracks for a given video."""
@@ -1316,6 +1415,19 @@ class Labels(MutableSequence):
             for instance in new_track_instances:
                 instance.track = old_track
 
+    def clear_track_at(self, video: Video, track: Track, frame_idx: int):
+        """Remove the given track from any instances on a single frame.
+
+        Args:
+            video: The :class:`Video` of the frame.
+            track: The :class:`Track` to clear.
+            frame_idx: The index of the frame in the video.
+        """
+        for lf in self.find(video, frame_idx):
+            for instance in lf.instances:
+                if instance.track is track:
+                    instance.track = None
+
     def remove_instance(
         self, frame: LabeledFrame, instance: Instance, in_transaction: bool = False
     ):
@@ -1324,6 +1436,36 @@ class Labels(MutableSequence):
         if not in_transaction:
             self._cache.remove_instance(frame, instance)
 
+    def remove_instances(
+        self,
+        lf_inst_list: List[Tuple[LabeledFrame, Instance]],
+        in_transaction: bool = False,
+    ):
+        """Remove many instances from their frames at once.
+
+        Each frame's list of instances is rebuilt once, rather than removing
+        instances from it one at a time.
+
+        Args:
+            lf_inst_list: A list of (labeled frame, instance) tuples.
+            in_transaction: If True, the caller is responsible for updating
+                the cache (e.g., with `update_cache`) afterwards. Otherwise the
+                cache is updated for each of the removed instances.
+        """
+        instances_by_frame = dict()
+        for lf, inst in lf_inst_list:
+            instances_by_frame.setdefault(lf, dict())[id(inst)] = inst
+
+        for lf, instances in instances_by_frame.items():
+            lf.instances[:] = [
+                inst for inst in lf.instances if id(inst) not in instances
+            ]
+
+        if not in_transaction:
+            for lf, instances in instances_by_frame.items():
+                for inst in instances.values():
+                    self._cache.remove_instance(lf, inst)
+
     def add_instance(self, frame: LabeledFrame, instance: Instance):
         """Add instance to frame, updating track occupancy."""
         # Ensure that there isn't already an Instance with this track
@@ -1558,6 +1700,18 @@ class Labels(MutableSequence):
         if video not in self.videos:
             self.videos.append(video)
 
+    def add_videos(self, videos: List[Video]):
+        """Add videos to the labels, skipping any which are already in it.
+
+        Args:
+            videos: List of `Video` instances.
+        """
+        existing_video_ids = {id(video) for video in self.videos}
+        for video in videos:
+            if id(video) not in existing_video_ids:
+                self.videos.append(video)
+                existing_video_ids.add(id(video))
+
     def remove_video(self, video: Video):
         """Remove a video from the labels and all associated labeled frames.
 
@@ -14,10 +14,10 @@ import numpy as np
 import math
 from collections import deque
 from time import perf_counter
-from typing import List, Optional, Tuple
+from typing import Callable, List, Optional, Tuple
 
 from queue import Queue
-from threading import Thread
+from threading import Event, Thread
 
 import logging
 
@@ -27,7 +27,13 @@ logger = logging.getLogger(__name__)
 _sentinel = object()
 
 
-def reader(out_q: Queue, video: Video, frames: List[int], scale: float = 1.0):
+def reader(
+    out_q: Queue,
+    video: Video,
+    frames: List[int],
+    scale: float = 1.0,
+    cancel_event: Optional[Event] = None,
+):
     """Read frame images from video and send them into queue.
 
     Args:
@@ -36,6 +42,7 @@ def reader(out_q: Queue, video: Video, frames: List[int], scale: float = 1.0):
         video: The `Video` object to read.
         frames: Full list frame indexes we want to read.
         scale: Output scale for frame images.
+        cancel_event: If given, stop reading (after current chunk) once set.
 
     Returns:
         None.
@@ -52,6 +59,9 @@ def reader(out_q: Queue, video: Video, frames: List[int], scale: float = 1.0):
     try:
         i = 0
         for chunk_i in range(chunk_count):
+            if cancel_event is not None and cancel_event.is_set():
+                logger.info(f"Cancelled after {chunk_i} chunks.")
+                break
 
             # Read the next chunk of frames
             frame_start = chunk_size * chunk_i
@@ -504,6 +514,8 @@ def save_labeled_video(
     palette: str = "standard",
     distinctly_color: str = "instances",
     gui_progress: bool = False,
+    progress_callback: Optional[Callable[[int, float], None]] = None,
+    cancel_event: Optional[Event] = None,
 ):
     """Function to generate and save video with annotations.
 
@@ -525,6 +537,11 @@ def save_labeled_video(
         distinctly_color: Specify how to color instances. Options include: "instances",
             "edges", and "nodes". Only used if `color_manager` is None.
         gui_progress: Whether to show Qt GUI progress dialog.
+        progress_callback: Function called with (frames complete, elapsed time)
+            as frames are written, instead of printing progress. Since this is
+            called from the thread which calls `save_labeled_video`, it can be
+            used for reporting progress when that isn't the GUI thread.
+        cancel_event: If given, stop generating video once this is set.
 
     Returns:
         None.
@@ -537,7 +554,10 @@ def save_labeled_video(
     q2 = Queue(maxsize=10)
     progress_queue = Queue()
 
-    thread_read = Thread(target=reader, args=(q1, video, frames, scale))
+    # Used to stop the reader, which then stops the other threads
+    cancel_event = cancel_event or Event()
+
+    thread_read = Thread(target=reader, args=(q1, video, frames, scale, cancel_event))
     thread_mark = VideoMarkerThread(
         in_q=q1,
         out_q=q2,
@@ -576,6 +596,7 @@ def save_labeled_video(
         if frames_complete == -1:
             break
         if progress_win is not None and progress_win.wasCanceled():
+            cancel_event.set()
             break
         fps = frames_complete / elapsed
         remaining_frames = len(frames) - frames_complete
@@ -583,6 +604,8 @@ def save_labeled_video(
 
         if gui_progress:
             progress_win.setValue(frames_complete)
+        elif progress_callback is not None:
+            progress_callback(frames_complete, elapsed)
         else:
             print(
                 f"Finished {frames_complete} frames in {elapsed:.1f} s, fps = {round(fps)}, approx {remaining_time:.1f} s remaining"
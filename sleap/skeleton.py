@@ -515,7 +515,7 @@ class Skeleton:
         if not isinstance(name, str):
             raise TypeError("Cannot add nodes to the skeleton that are not str")
 
-        if name in self.node_names:
+        if self.has_node(name):
             raise ValueError("Skeleton already has a node named ({})".format(name))
 
         self._graph.add_node(Node(name))
@@ -878,7 +878,7 @@ class Skeleton:
             True for yes, False for no.
 
         """
-        return name in self.node_names
+        return any(node.name == name for node in self._graph)
 
     def has_nodes(self, names: Iterable[str]) -> bool:
         """
@@ -1163,6 +1163,35 @@ class Skeleton:
 
         return list(skeletons.values())
 
+    @classmethod
+    def load_first_hdf5(cls, file: H5FileRef) -> "Skeleton":
+        """
+        Load only the first skeleton found in the HDF5 file.
+
+        This avoids deserializing every skeleton in the file when only one
+        is needed.
+
+        Args:
+            file: The file name or open h5py.File
+
+        Returns:
+            The first `Skeleton` instance stored in the HDF5 file.
+
+        Raises:
+            ValueError: If there are no skeletons in the file.
+        """
+        if isinstance(file, str):
+            with h5py.File(file, "r") as _file:
+                return cls._load_first_hdf5(_file)
+        return cls._load_first_hdf5(file)
+
+    @classmethod
+    def _load_first_hdf5(cls, file: h5py.File) -> "Skeleton":
+        if "skeleton" in file:
+            for name, json_str in file["skeleton"].attrs.items():
+                return cls.from_json(json_str)
+        raise ValueError("No skeletons found in HDF5 file.")
+
     @classmethod
     def _load_hdf5(cls, file: h5py.File):
 
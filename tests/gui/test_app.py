@@ -3,6 +3,7 @@ from qtpy.QtWidgets import QApplication
 
 from sleap.gui.app import MainWindow
 from sleap.gui.commands import *
+from sleap.gui.suggestions import VideoFrameSuggestions
 
 
 def test_app_workflow(
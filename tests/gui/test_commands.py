@@ -1,22 +1,37 @@
+import gc
 from pathlib import PurePath, Path
 import shutil
 import sys
 from typing import List
 
+import numpy as np
 import pytest
 from qtpy.QtWidgets import QComboBox
 
 from sleap import Skeleton, Track
 from sleap.gui.commands import (
+    AddInstance,
     CommandContext,
+    FakeApp,
     ImportDeepLabCutFolder,
     ExportAnalysisFile,
     ReplaceVideo,
     OpenSkeleton,
     SaveProjectAs,
+    DeleteAllPredictions,
+    DeleteAreaPredictions,
+    EditCommand,
+    ExportLabeledClip,
+    MergeProject,
+    AddMissingInstanceNodes,
+    GenerateSuggestions,
+    SuggestionsWorker,
+    UpdateTopic,
     get_new_version_filename,
 )
-from sleap.instance import Instance, LabeledFrame
+from sleap.gui.state import GuiState
+from sleap.gui.suggestions import SuggestionFrame
+from sleap.instance import Instance, LabeledFrame, Point
 from sleap.io.convert import default_analysis_filename
 from sleap.io.dataset import Labels
 from sleap.io.format.adaptor import Adaptor
@@ -48,6 +63,566 @@ def test_delete_user_dialog(centered_pair_predictions):
     assert len(context.state["labeled_frame"].user_instances) == 2
 
 
+def test_delete_area_predictions_instance_list(centered_pair_predictions: Labels):
+    labels = centered_pair_predictions
+    context = CommandContext.from_labels(labels)
+    context.state["video"] = labels.video
+    params = dict(min_corner=(0, 0), max_corner=(250, 300))
+
+    def is_bounded(inst):
+        points = inst.points_array
+        points = points[~np.isnan(points).any(axis=1)]
+        return np.all(points >= (0, 0)) and np.all(points <= (250, 300))
+
+    expected = [
+        (lf, inst)
+        for lf in labels
+        for inst in lf.predicted_instances
+        if is_bounded(inst)
+    ]
+    lf_inst_list = DeleteAreaPredictions.get_frame_instance_list(context, params)
+    assert lf_inst_list == expected
+
+    # All instances are inside an area which covers the whole frame
+    params = dict(min_corner=(-1, -1), max_corner=(1e6, 1e6))
+    lf_inst_list = DeleteAreaPredictions.get_frame_instance_list(context, params)
+    assert len(lf_inst_list) == len(labels.predicted_instances)
+
+
+def test_signal_update_batch(min_tracks_2node_labels: Labels):
+    """Test that updates signaled within a batch are passed along together."""
+    calls = []
+    context = CommandContext.from_labels(min_tracks_2node_labels)
+    context.update_callback = calls.append
+
+    # Outside of a batch the callback is called immediately
+    context.signal_update([UpdateTopic.frame])
+    assert calls == [[UpdateTopic.frame]]
+
+    calls.clear()
+    with context.batch():
+        context.signal_update([UpdateTopic.frame, UpdateTopic.tracks])
+        with context.batch():
+            context.signal_update([UpdateTopic.frame])
+        assert calls == []
+    assert len(calls) == 1
+    assert set(calls[0]) == {UpdateTopic.frame, UpdateTopic.tracks}
+
+    # All other topics are dropped when everything needs updating
+    calls.clear()
+    with context.batch():
+        context.signal_update([UpdateTopic.frame])
+        context.signal_update([UpdateTopic.all])
+    assert calls == [[UpdateTopic.all]]
+
+
+def test_has_ask_and_do():
+    assert MergeProject.has_ask_and_do
+    assert not DeleteAllPredictions.has_ask_and_do
+    assert not OpenSkeleton.has_ask_and_do
+
+    class SubclassedMergeProject(MergeProject):
+        pass
+
+    assert SubclassedMergeProject.has_ask_and_do
+
+
+@pytest.fixture
+def merge_dialogs(monkeypatch):
+    """Replaces `MergeDialog` with one which merges without asking."""
+    import sleap.gui.dialogs.merge
+
+    merged = []
+
+    class FakeMergeDialog:
+        def __init__(self, base_labels: Labels, new_labels: Labels):
+            merged.append(new_labels)
+            Labels.complex_merge_between(base_labels, new_labels)
+
+        def exec_(self):
+            pass
+
+    monkeypatch.setattr(sleap.gui.dialogs.merge, "MergeDialog", FakeMergeDialog)
+    return merged
+
+
+def test_MergeProject(min_tracks_2node_labels: Labels, merge_dialogs, monkeypatch):
+    labels = min_tracks_2node_labels
+    context = CommandContext.from_labels(labels)
+    n_videos = len(labels.videos)
+
+    def make_gui_video_callback(*args, **kwargs):
+        raise AssertionError("Videos should be found without the GUI")
+
+    monkeypatch.setattr(Labels, "make_gui_video_callback", make_gui_video_callback)
+
+    filenames = [
+        "tests/data/slp_hdf5/small_robot_minimal.slp",
+        "tests/data/slp_hdf5/minimal_instance.slp",
+    ]
+    context.execute(MergeProject, filenames=filenames)
+
+    # Files are merged in order
+    assert [new_labels.video.backend.filename for new_labels in merge_dialogs] == [
+        "tests/data/videos/small_robot.mp4",
+        "tests/data/json_format_v1/centered_pair_low_quality.mp4",
+    ]
+    assert len(labels.videos) == n_videos + 2
+    assert context.state["has_changes"]
+
+    assert context.undo()
+    assert len(labels.videos) == n_videos
+    assert not context.has_any_changes
+
+
+def test_MergeProject_find_videos_with_gui(
+    min_tracks_2node_labels: Labels, merge_dialogs, monkeypatch
+):
+    labels = min_tracks_2node_labels
+    context = CommandContext.from_labels(labels)
+
+    # The project's video isn't where the file says it is
+    calls = []
+
+    def make_gui_video_callback(search_paths=None):
+        calls.append(search_paths)
+        return Labels.make_video_callback(["tests/data/videos/dance.mp4"])
+
+    monkeypatch.setattr(Labels, "make_gui_video_callback", make_gui_video_callback)
+
+    context.execute(
+        MergeProject, filenames=["tests/data/slp_hdf5/dance.mp4.labels.slp"]
+    )
+    assert calls == [["tests/data/slp_hdf5"]]
+    assert len(merge_dialogs) == 1
+    assert merge_dialogs[0].video.backend.filename == "tests/data/videos/dance.mp4"
+    assert context.state["has_changes"]
+
+
+def test_MergeProject_load_error(
+    min_tracks_2node_labels: Labels, merge_dialogs, monkeypatch, tmpdir
+):
+    from qtpy.QtWidgets import QMessageBox
+
+    labels = min_tracks_2node_labels
+    context = CommandContext.from_labels(labels)
+    messages = []
+    monkeypatch.setattr(QMessageBox, "exec_", lambda self: messages.append(self.text()))
+
+    bad_filename = str(Path(tmpdir, "bad.slp"))
+    Path(bad_filename).write_text("not a labels file")
+    filenames = ["tests/data/slp_hdf5/small_robot_minimal.slp", bad_filename]
+    context.execute(MergeProject, filenames=filenames)
+
+    # The file which was loaded is still merged, and the change is recorded
+    assert messages == [f"Unable to load {bad_filename}."]
+    assert len(merge_dialogs) == 1
+    assert context.state["has_changes"]
+    assert context.undo()
+
+
+def test_signal_update_later(qtbot, min_tracks_2node_labels: Labels):
+    """Test that deferred updates are coalesced until the event loop runs."""
+    calls = []
+    context = CommandContext.from_labels(min_tracks_2node_labels)
+    context.update_callback = calls.append
+
+    for _ in range(5):
+        context.signal_update_later([UpdateTopic.on_frame])
+    assert calls == []
+
+    qtbot.waitUntil(lambda: len(calls) > 0)
+    qtbot.wait(10)
+    assert calls == [[UpdateTopic.on_frame]]
+
+
+def test_suggestion_index_of(min_tracks_2node_labels: Labels):
+    labels = min_tracks_2node_labels
+    video = labels.video
+    labels.suggestions = [SuggestionFrame(video, frame_idx=i) for i in range(5)]
+    context = CommandContext.from_labels(labels)
+
+    assert context.suggestion_index_of(labels.suggestions[3]) == 3
+
+    # Index is rebuilt when the cached position is stale
+    labels.suggestions.pop(0)
+    assert context.suggestion_index_of(labels.suggestions[2]) == 2
+
+    new_suggestion = SuggestionFrame(video, frame_idx=10)
+    labels.suggestions.insert(0, new_suggestion)
+    context.signal_update([UpdateTopic.suggestions])
+    assert context.suggestion_index_of(new_suggestion) == 0
+    assert context.suggestion_index_of(labels.suggestions[3]) == 3
+
+
+def test_SuggestionsWorker(qtbot, min_tracks_2node_labels: Labels):
+    from qtpy.QtCore import QThreadPool
+
+    labels = min_tracks_2node_labels
+    video = labels.videos[0]
+    params = dict(
+        method="sample",
+        per_video=5,
+        sampling_method="stride",
+        videos=labels.videos,
+    )
+    worker = SuggestionsWorker(labels=labels, params=params)
+
+    # Worker uses a copy of the frames and instances, but the same videos
+    assert worker.labels is not labels
+    assert worker.labels.videos == labels.videos
+    assert len(worker.labels) == len(labels)
+    lf, lf_copy = labels[0], worker.labels[0]
+    assert lf_copy is not lf
+    assert lf_copy.instances[0] is not lf.instances[0]
+    np.testing.assert_array_equal(lf_copy.instances[0].numpy(), lf.instances[0].numpy())
+
+    # Edits in the GUI don't change the snapshot
+    lf.instances[0]["head"].x += 10
+    labels.remove_frame(labels[-1])
+    assert len(worker.labels) == len(labels) + 1
+    assert lf_copy.instances[0]["head"].x == lf.instances[0]["head"].x - 10
+
+    with qtbot.waitSignal(worker.signals.finished, timeout=10000) as blocker:
+        QThreadPool.globalInstance().start(worker)
+    suggestions = blocker.args[0]
+    assert len(suggestions) == 5
+    assert all(sugg.video is video for sugg in suggestions)
+
+    # Cancelled worker stops without generating suggestions
+    worker = SuggestionsWorker(labels=labels, params=params)
+    worker.cancelled = True
+    with qtbot.waitSignal(worker.signals.finished, timeout=10000) as blocker:
+        QThreadPool.globalInstance().start(worker)
+    assert blocker.args[0] == []
+
+
+def test_GenerateSuggestions_already_running(min_tracks_2node_labels: Labels):
+    labels = min_tracks_2node_labels
+    context = CommandContext.from_labels(labels)
+    params = dict(method="sample", target="all videos")
+
+    assert GenerateSuggestions.ask(context, params)
+    assert params["videos"] == labels.videos
+
+    # Don't start again (or record a change) while suggestions are generated
+    context._suggestions_worker = object()
+    assert not GenerateSuggestions.ask(context, dict(params))
+    context.execute(GenerateSuggestions, **params)
+    assert not context.has_any_changes
+
+
+def test_new_node_names(min_tracks_2node_labels: Labels):
+    labels = min_tracks_2node_labels
+    skeleton = labels.skeleton
+    context = CommandContext.from_labels(labels)
+    context.state["skeleton"] = skeleton
+
+    context.newNode()
+    context.newNode()
+    skeleton.add_node("new_part_2")
+    context.newNode()
+
+    assert "new_part" in skeleton
+    assert "new_part_1" in skeleton
+    assert "new_part_3" in skeleton
+    assert "new_part_4" not in skeleton
+
+
+def test_force_directed_layout_cache():
+    skeleton = Skeleton.from_names_and_edge_inds(["a", "b", "c"], [(0, 1), (1, 2)])
+
+    layout = AddMissingInstanceNodes.get_force_directed_layout(skeleton)
+    assert layout.shape == (3, 2)
+    assert np.allclose(layout.mean(axis=0), 0)
+    assert AddMissingInstanceNodes.get_force_directed_layout(skeleton) is layout
+
+    # Layout is recomputed when the skeleton changes
+    skeleton.add_node("d")
+    skeleton.add_edge("c", "d")
+    new_layout = AddMissingInstanceNodes.get_force_directed_layout(skeleton)
+    assert new_layout.shape == (4, 2)
+
+    # Cached layout doesn't keep the skeleton alive
+    assert skeleton in AddMissingInstanceNodes._force_directed_layouts
+    n_layouts = len(AddMissingInstanceNodes._force_directed_layouts)
+    del skeleton
+    gc.collect()
+    assert len(AddMissingInstanceNodes._force_directed_layouts) == n_layouts - 1
+
+
+def test_add_random_nodes(min_tracks_2node_labels: Labels):
+    from qtpy.QtCore import QRectF
+
+    labels = min_tracks_2node_labels
+    context = CommandContext.from_labels(labels)
+    skeleton = labels.skeletons[0]
+    instance = Instance(skeleton=skeleton)
+    instance["head"] = Point(x=1, y=2)
+
+    rect = QRectF(100, 200, 50, 50)
+    AddMissingInstanceNodes.add_random_nodes(
+        context, instance, visible=True, view_rect=rect
+    )
+
+    # Existing points are kept, missing points are placed inside the rect
+    assert not instance.missing_mask().any()
+    assert (instance["head"].x, instance["head"].y) == (1, 2)
+    thorax = instance["thorax"]
+    assert thorax.visible
+    assert 100 <= thorax.x <= 150 and 200 <= thorax.y <= 250
+
+    # Nothing to add, so we don't need the visible rect (which the context can't
+    # get since it has no player)
+    AddMissingInstanceNodes.add_random_nodes(context, instance, visible=True)
+
+
+def test_add_nodes_with_empty_view_rect(min_tracks_2node_labels: Labels):
+    from qtpy.QtCore import QPointF, QRectF
+
+    labels = min_tracks_2node_labels
+    context = CommandContext.from_labels(labels)
+    skeleton = labels.skeletons[0]
+
+    # Empty rects and points at the origin are falsy, but should still be used
+    # (the context has no player to get the visible rect from)
+    instance = Instance(skeleton=skeleton)
+    AddMissingInstanceNodes.add_random_nodes(
+        context, instance, visible=True, view_rect=QRectF()
+    )
+    np.testing.assert_array_equal(instance.numpy(), np.zeros((2, 2)))
+
+    instance = Instance(skeleton=skeleton)
+    AddMissingInstanceNodes.add_nodes_from_template(
+        context, instance, visible=True, center_point=QPointF(0, 0)
+    )
+    assert not instance.missing_mask().any()
+
+
+def test_undo(min_tracks_2node_labels: Labels):
+    """Test that point moves, added and deleted instances can be undone."""
+    labels = min_tracks_2node_labels
+    video = labels.video
+    lf = labels.find(video, frame_idx=0)[0]
+
+    # Every frame in the fixture is labeled, so free up the last one
+    unlabeled_idx = video.num_frames - 1
+    labels.remove_frame(labels.find(video, frame_idx=unlabeled_idx)[0])
+    n_frames = len(labels)
+    n_instances = len(lf.instances)
+
+    context = CommandContext.from_labels(labels)
+    context.state["video"] = video
+    context.state["skeleton"] = labels.skeleton
+    context.state["labeled_frame"] = lf
+    context.state["frame_idx"] = lf.frame_idx
+    assert not context.undo()
+
+    # Move a point
+    instance = lf.instances[0]
+    node = labels.skeleton.nodes[0]
+    x, y = instance[node].x, instance[node].y
+    context.setPointLocations(instance, {node: (x + 10, y + 10)})
+    assert instance[node].x == x + 10
+    assert context.undo()
+    assert (instance[node].x, instance[node].y) == (x, y)
+
+    # Delete an instance
+    context.state["instance"] = instance
+    context.deleteSelectedInstance()
+    assert instance not in lf.instances
+    assert context.undo()
+    assert lf.instances[0] is instance
+
+    # Add an instance on a frame which wasn't labeled
+    new_lf = LabeledFrame(video=video, frame_idx=unlabeled_idx)
+    assert new_lf not in labels.labels
+    context.state["instance"] = None
+    context.state["labeled_frame"] = new_lf
+    context.state["frame_idx"] = new_lf.frame_idx
+    context.newInstance(copy_instance=instance)
+    assert len(new_lf.instances) == 1
+    assert new_lf in labels.labels
+    assert context.undo()
+    assert len(new_lf.instances) == 0
+    assert new_lf not in labels.labels
+
+    assert len(labels) == n_frames
+    assert len(lf.instances) == n_instances
+    assert not context.state["has_changes"]
+    assert not context.undo()
+
+
+def test_AddInstance_nothing_to_add(min_tracks_2node_labels: Labels):
+    labels = min_tracks_2node_labels
+    lf = labels[0]
+    n_instances = len(lf.instances)
+    context = CommandContext.from_labels(labels)
+
+    # No frame to add the instance to
+    context.state["skeleton"] = labels.skeleton
+    context.state["labeled_frame"] = None
+    context.execute(AddInstance)
+    assert not context.has_any_changes
+
+    # No nodes in the skeleton
+    context.state["skeleton"] = Skeleton()
+    context.state["labeled_frame"] = lf
+    context.execute(AddInstance)
+    assert len(lf.instances) == n_instances
+    assert not context.has_any_changes
+    assert not context.undo()
+
+
+def test_undo_unsaved_on_load(min_tracks_2node_labels: Labels):
+    labels = min_tracks_2node_labels
+    instance = labels[0].instances[0]
+    node = labels.skeleton.nodes[0]
+    x = instance[node].x
+
+    # Project had changes when it was loaded, so undoing everything on the stack
+    # doesn't get back to the saved project
+    context = CommandContext.from_labels(labels)
+    context.changestack_clear(has_changes=True)
+    context.setPointLocations(instance, {node: (x + 1, 0)})
+    assert context.undo()
+    assert instance[node].x == x
+    assert context.state["has_changes"]
+
+    context.changestack_clear()
+    context.setPointLocations(instance, {node: (x + 1, 0)})
+    assert context.undo()
+    assert not context.state["has_changes"]
+
+
+def test_undo_snapshot(centered_pair_predictions: Labels):
+    """Test that commands which change lots of data can be undone."""
+    labels = centered_pair_predictions
+    n_frames = len(labels)
+    n_instances = len(labels.all_instances)
+
+    context = CommandContext.from_labels(labels)
+    context.state["video"] = labels.video
+
+    params = dict(
+        lf_instance_list=DeleteAllPredictions.get_frame_instance_list(context, {})
+    )
+    DeleteAllPredictions.do_with_signal(context, params)
+    assert len(labels.predicted_instances) == 0
+
+    assert context.undo()
+    assert len(labels) == n_frames
+    assert len(labels.all_instances) == n_instances
+    assert len(labels.find(labels.video, frame_idx=123)[0].predicted_instances) == 2
+
+    # Deleting is a single change, which has been undone
+    assert not context.has_any_changes
+
+
+def test_undo_transaction(min_tracks_2node_labels: Labels):
+    """Test that changes made in a transaction are undone together."""
+    labels = min_tracks_2node_labels
+    instance = labels[0].instances[0]
+    node = labels.skeleton.nodes[0]
+    x = instance[node].x
+
+    context = CommandContext.from_labels(labels)
+    context.changestack_push("unrelated change")
+    with context.transaction():
+        context.setPointLocations(instance, {node: (x + 1, 0)})
+        context.setPointLocations(instance, {node: (x + 2, 0)})
+    assert instance[node].x == x + 2
+
+    assert context.undo()
+    assert instance[node].x == x
+    assert context.has_any_changes
+    assert not context.undo()
+
+
+def test_undo_nested_command(min_tracks_2node_labels: Labels):
+    """Test that a command which executes another command is undone fully."""
+    labels = min_tracks_2node_labels
+    lf = labels[0]
+    instances = list(lf.instances)
+    assert len(instances) > 1
+
+    class AppendInstance(EditCommand):
+        undo_strategy = "patch"
+
+        @staticmethod
+        def inverse(context, params):
+            index = len(params["frame"].instances)
+            return [
+                {
+                    "op": "remove",
+                    "path": ("frame", params["frame"], "instances"),
+                    "index": index,
+                }
+            ]
+
+        @staticmethod
+        def do_action(context, params):
+            lf = params["frame"]
+            context.labels.add_instance(lf, Instance(skeleton=labels.skeleton))
+
+    class RemoveFirstThenAppend(EditCommand):
+        undo_strategy = "snapshot"
+
+        @staticmethod
+        def do_action(context, params):
+            lf = params["frame"]
+            context.labels.remove_instance(lf, lf.instances[0])
+            context.execute(AppendInstance, frame=lf)
+
+    context = CommandContext.from_labels(labels)
+    context.execute(RemoveFirstThenAppend, frame=lf)
+    assert len(lf.instances) == len(instances)
+    assert lf.instances[0] is not instances[0]
+
+    # The appended instance is removed before restoring the snapshot
+    assert context.undo()
+    assert lf.instances == instances
+    assert not context.has_any_changes
+
+
+def test_undo_non_undoable_in_transaction(min_tracks_2node_labels: Labels):
+    labels = min_tracks_2node_labels
+    instance = labels[0].instances[0]
+    node = labels.skeleton.nodes[0]
+    x = instance[node].x
+
+    context = CommandContext.from_labels(labels)
+    with context.transaction():
+        context.setPointLocations(instance, {node: (x + 1, 0)})
+        context.changestack_push("change which can't be undone")
+
+    # Nothing is undone unless the whole transaction can be undone
+    assert not context.undo()
+    assert instance[node].x == x + 1
+    assert len(context._change_stack) == 2
+
+
+def test_changestack_max_history(min_tracks_2node_labels: Labels):
+    labels = min_tracks_2node_labels
+    instance = labels[0].instances[0]
+    node = labels.skeleton.nodes[0]
+    x = instance[node].x
+
+    context = CommandContext(state=GuiState(), app=FakeApp(labels), max_history=2)
+    for i in range(1, 4):
+        context.setPointLocations(instance, {node: (x + i, 0)})
+
+    # Only the two most recent changes can be undone
+    assert context.undo()
+    assert context.undo()
+    assert instance[node].x == x + 1
+    assert not context.undo()
+
+    # The first change is still applied, so there are still unsaved changes
+    assert context.has_any_changes
+    assert context.state["has_changes"]
+
+
 def test_import_labels_from_dlc_folder():
     csv_files = ImportDeepLabCutFolder.find_dlc_files_in_folder(
         "tests/data/dlc_multiple_datasets"
@@ -257,6 +832,47 @@ def test_ExportAnalysisFile(
         okay = ExportAnalysisFile_ask(context=context, params=params)
 
 
+def test_ExportLabeledClip(qtbot, centered_pair_predictions: Labels, tmpdir):
+    from qtpy.QtWidgets import QWidget
+    from sleap.gui.color import ColorManager
+
+    labels = centered_pair_predictions
+    video = labels.videos[0]
+
+    class App(QWidget):
+        pass
+
+    app = App()
+    app.labels = labels
+    context = CommandContext(state=GuiState(), app=app)
+    context.state["labels"] = labels
+    context.state["video"] = video
+
+    filename = str(Path(tmpdir, "clip.avi"))
+    params = {
+        "filename": filename,
+        "frames": range(3),
+        "fps": 15,
+        "scale": 1.0,
+        "color_manager": ColorManager(labels),
+        "show edges": True,
+        "edge_is_wedge": False,
+        "marker size": 4,
+        "crop": None,
+        "open_when_done": False,
+    }
+    ExportLabeledClip.do_action(context, params)
+    thread = context._export_clip_thread
+    assert thread is not None
+
+    # Only one clip is exported at a time
+    ExportLabeledClip.do_action(context, dict(params))
+    assert context._export_clip_thread is thread
+
+    qtbot.waitUntil(lambda: context._export_clip_thread is None, timeout=30000)
+    assert Path(filename).exists()
+
+
 def test_ToggleGrayscale(centered_pair_predictions: Labels):
     """Test functionality for ToggleGrayscale on mp4/avi video"""
     labels = centered_pair_predictions
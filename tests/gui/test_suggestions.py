@@ -24,6 +24,22 @@ def test_velocity_suggestions(centered_pair_predictions):
     assert suggestions[1].frame_idx == 45
 
 
+def test_suggestions_progress_callback(centered_pair_predictions: Labels):
+    progress = []
+    VideoFrameSuggestions.suggest(
+        labels=centered_pair_predictions,
+        params=dict(
+            videos=centered_pair_predictions.videos,
+            method="sample",
+            per_video=5,
+            sampling_method="stride",
+        ),
+        progress_callback=lambda n_done, n_total: progress.append((n_done, n_total)),
+    )
+    n_videos = len(centered_pair_predictions.videos)
+    assert progress == [(i + 1, n_videos) for i in range(n_videos)]
+
+
 def test_frame_increment(centered_pair_predictions: Labels):
     # Testing videos that have less frames than desired Samples per Video (stride)
     # Expected result is there should be n suggestions where n is equal to the frames
@@ -44,3 +44,20 @@ def test_align_points():
 
     assert np.allclose(mean[1], [-10, 0], atol=0.1)
     assert np.allclose(mean[2], [-24, -1], atol=0.1)
+
+
+def test_align_instance_points():
+    source = np.array([[0, 0], [10, 0], [10, 5], [0, 5]], dtype="float64")
+
+    # Target is the source rotated by 90 degrees and shifted, missing a point
+    R = np.array([[0, -1], [1, 0]])
+    target = source @ R.T + [100, 50]
+    target[2] = np.nan
+
+    aligned = align.align_instance_points(source, target)
+    assert np.allclose(aligned, source @ R.T + [100, 50])
+
+    # With only one matching point, the source is just shifted
+    target[1:] = np.nan
+    aligned = align.align_instance_points(source, target)
+    assert np.allclose(aligned, source + [100, 50])
@@ -0,0 +1,27 @@
+import numpy as np
+
+from sleap.info.layout import get_force_directed_layout
+
+
+def test_get_force_directed_layout():
+    # Chain of three nodes (0 - 1 - 2) and one node without any edges
+    adjacency = np.zeros((4, 4))
+    adjacency[0, 1] = adjacency[1, 0] = 1
+    adjacency[1, 2] = adjacency[2, 1] = 1
+
+    layout = get_force_directed_layout(adjacency, scale=50, center=(100, 200))
+
+    assert layout.shape == (4, 2)
+    assert np.all(np.isfinite(layout))
+    assert np.isclose(np.abs(layout - layout.mean(axis=0)).max(), 50)
+    assert np.allclose(layout.mean(axis=0), [100, 200])
+
+    # Nodes joined by an edge are closer than nodes which aren't
+    dist = np.linalg.norm(layout[:, np.newaxis] - layout[np.newaxis], axis=-1)
+    assert dist[0, 1] < dist[0, 2]
+    assert dist[1, 2] < dist[0, 2]
+
+    # Same seed gives the same layout
+    assert np.allclose(
+        layout, get_force_directed_layout(adjacency, scale=50, center=(100, 200))
+    )
@@ -278,6 +278,61 @@ def test_label_accessors(centered_pair_labels: Labels, min_tracks_2node_labels:
         prev_idx = suggestion.frame_idx
 
 
+def test_frames_wraparound(centered_pair_labels: Labels):
+    labels = centered_pair_labels
+    video = labels.videos[0]
+    frame_idxs = sorted(lf.frame_idx for lf in labels.find(video))
+
+    # Past the last frame we wrap around to the first
+    f = labels.frames(video, from_frame_idx=frame_idxs[-1])
+    assert next(f).frame_idx == frame_idxs[0]
+    f = labels.frames(video, from_frame_idx=frame_idxs[0], reverse=True)
+    assert next(f).frame_idx == frame_idxs[-1]
+
+    # Removing frames updates the order
+    labels.remove_frame(labels.find(video, frame_idxs[1])[0])
+    f = labels.frames(video, from_frame_idx=frame_idxs[0])
+    assert next(f).frame_idx == frame_idxs[2]
+    assert len(list(labels.frames(video))) == len(frame_idxs) - 1
+
+    # Only frames with user instances
+    lf = labels.find(video, frame_idxs[2])[0]
+    assert lf.has_user_instances
+    f = labels.frames(video, from_frame_idx=frame_idxs[0], user_only=True)
+    assert next(f).frame_idx == frame_idxs[2]
+    for inst in list(lf.user_instances):
+        labels.remove_instance(lf, inst)
+    f = labels.frames(video, from_frame_idx=frame_idxs[0], user_only=True)
+    assert next(f).frame_idx == frame_idxs[3]
+
+    # No labeled frames left in video
+    labels.remove_frames(labels.find(video))
+    assert list(labels.frames(video)) == []
+
+    # Video which was never labeled
+    new_video = Video.from_filename("new_video.mp4")
+    labels.add_video(new_video)
+    assert list(labels.frames(new_video, reverse=True)) == []
+
+
+def test_find_frame_range(centered_pair_predictions: Labels):
+    labels = centered_pair_predictions
+    video = labels.video
+    frame_idxs = sorted(lf.frame_idx for lf in labels.find(video))
+
+    lfs = labels.find(video, frame_idx=range(frame_idxs[2], frame_idxs[10]))
+    assert [lf.frame_idx for lf in lfs] == frame_idxs[2:10]
+
+    lfs = labels.find(video, frame_idx=range(frame_idxs[-1] + 1, frame_idxs[-1] + 5))
+    assert lfs == []
+
+    # Ranges with steps are still checked one frame at a time
+    lfs = labels.find(video, frame_idx=range(frame_idxs[0], frame_idxs[-1] + 1, 2))
+    assert [lf.frame_idx for lf in lfs] == [
+        idx for idx in frame_idxs if (idx - frame_idxs[0]) % 2 == 0
+    ]
+
+
 def test_scalar_properties():
     # Scalar
     dummy_video = Video(backend=MediaVideo)
@@ -339,6 +394,16 @@ def test_has_missing_videos():
     assert not labels.has_missing_videos
 
 
+def test_add_videos():
+    video_a = Video.from_filename("tests/data/videos/small_robot.mp4")
+    video_b = Video.from_filename("tests/data/videos/small_robot.mp4")
+    labels = Labels()
+    labels.add_video(video_a)
+
+    labels.add_videos([video_a, video_b, video_b])
+    assert labels.videos == [video_a, video_b]
+
+
 def test_label_mutability():
     dummy_video = Video(backend=MediaVideo)
     dummy_skeleton = Skeleton()
@@ -1418,6 +1483,65 @@ def test_remove_unused_tracks(min_tracks_2node_labels: Labels):
     assert len(labels.tracks) == 2
 
 
+def test_remove_instances(centered_pair_predictions: Labels, monkeypatch):
+    labels = centered_pair_predictions
+    lfs = labels.labeled_frames[:3]
+    n_instances = len(labels.all_instances)
+    lf_inst_list = [(lf, inst) for lf in lfs for inst in lf.instances[:1]]
+    kept = [lf.instances[1:] for lf in lfs]
+
+    # Only the removed instances should be updated in the cache
+    def fail_update_cache():
+        raise AssertionError("update_cache shouldn't be called")
+
+    monkeypatch.setattr(labels, "update_cache", fail_update_cache)
+
+    labels.remove_instances(lf_inst_list)
+    assert len(labels.all_instances) == n_instances - len(lf_inst_list)
+    for lf, instances in zip(lfs, kept):
+        assert lf.instances == instances
+
+
+def test_clear_track_at(min_tracks_2node_labels: Labels):
+    labels = min_tracks_2node_labels
+    track = labels.tracks[0]
+    lf, next_lf = labels.labeled_frames[:2]
+
+    labels.clear_track_at(labels.video, track, lf.frame_idx)
+    assert all(inst.track is not track for inst in lf.instances)
+    assert any(inst.track is track for inst in next_lf.instances)
+
+    # Nothing happens for frames that aren't labeled
+    labels.clear_track_at(labels.video, track, labels.video.frames + 1)
+
+
+def test_frames_user_only_after_remove_user_instances(min_dance_labels: Labels):
+    labels = min_dance_labels
+    video = labels.video
+    assert len(list(labels.frames(video, user_only=True))) == 3
+
+    labels.remove_user_instances()
+    assert not any(lf.has_user_instances for lf in labels)
+    assert list(labels.frames(video, user_only=True)) == []
+
+
+def test_get_template_instance_points_centered(centered_pair_predictions: Labels):
+    labels = centered_pair_predictions
+    skeleton = labels.skeleton
+
+    template_points = labels.get_template_instance_points(skeleton)
+    assert template_points.shape == (len(skeleton.nodes), 2)
+
+    template_centered = labels.get_template_instance_points(skeleton, centered=True)
+    np.testing.assert_allclose(
+        template_centered, template_points - np.nanmean(template_points, axis=0)
+    )
+
+    # The centered points are cached along with the template
+    cached_centered = labels.get_template_instance_points(skeleton, centered=True)
+    assert cached_centered is template_centered
+
+
 def test_remove_empty_frames(min_labels):
     min_labels.append(sleap.LabeledFrame(video=min_labels.video, frame_idx=2))
     assert len(min_labels) == 2
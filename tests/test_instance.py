@@ -190,6 +190,46 @@ def test_points_array(skeleton):
     assert np.isnan(pts[skeleton.node_to_index("thorax"), :]).all()
 
 
+def test_set_points_bulk(skeleton):
+    instance = Instance(skeleton=skeleton)
+    n_nodes = len(skeleton.nodes)
+
+    xy = np.arange(n_nodes * 2, dtype=float).reshape(n_nodes, 2)
+    instance.set_points_bulk(xy, complete=True)
+    assert np.allclose(instance.points_array, xy)
+    assert all(pt.complete for pt in instance.points)
+
+    # Only set some of the nodes
+    head_idx = skeleton.node_to_index("head")
+    instance.set_points_bulk(
+        [[100, 200]], visible=[False], node_idxs=np.array([head_idx])
+    )
+    assert instance["head"].x == 100 and instance["head"].y == 200
+    assert not instance["head"].visible
+    assert not instance["head"].complete
+    assert np.isnan(instance.points_array[head_idx]).all()
+
+
+def test_set_missing_from_xy(skeleton):
+    instance = Instance(skeleton=skeleton, points={"head": Point(1, 2)})
+    head_idx = skeleton.node_to_index("head")
+    n_nodes = len(skeleton.nodes)
+
+    missing = instance.missing_mask()
+    assert missing.shape == (n_nodes,)
+    assert not missing[head_idx] and missing.sum() == n_nodes - 1
+
+    xy = np.full((n_nodes, 2), 10.0)
+    instance.set_missing_from_xy(xy, visible=True)
+    assert not instance.missing_mask().any()
+
+    # Existing points are kept
+    assert instance["head"].x == 1 and instance["head"].y == 2
+    for i, node in enumerate(skeleton.nodes):
+        if i != head_idx:
+            assert instance[node].x == 10 and instance[node].visible
+
+
 def test_points_array_copying(skeleton):
     node_names = ["left-wing", "head", "right-wing"]
     points = {"head": Point(1, 4), "left-wing": Point(2, 5), "right-wing": Point(3, 6)}
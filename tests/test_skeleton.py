@@ -249,6 +249,7 @@ def test_hdf5(skeleton, stickman, tmpdir):
     # Check individual load
     assert Skeleton.load_hdf5(filename, skeleton.name).matches(skeleton)
     assert Skeleton.load_hdf5(filename, stickman.name).matches(stickman)
+    assert Skeleton.load_first_hdf5(filename).matches(skeleton)
 
     # Check overwrite save and save list
     Skeleton.save_all_hdf5(filename, [skeleton, stickman])